@@ -0,0 +1,49 @@
+"""
+Backfill bar history for a universe into the local bar store.
+
+    python -m backfill forex --intervals 1hour,daily --from 2023-01-01 --to 2024-12-31
+
+Rerunning the same command resumes from its checkpoint.
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from fmp.aioconnect import afmp_bridge
+from technicals.ratings import EXCHANGES
+from .job import BackfillJob, WINDOW_DAYS
+
+
+async def main(args):
+    job = BackfillJob(
+        args.universe,
+        [i.strip() for i in args.intervals.split(",") if i.strip()],
+        args.from_date,
+        args.to_date,
+        concurrency=args.concurrency,
+        symbols=[s.strip() for s in args.symbols.split(",")] if args.symbols else None,
+    )
+    try:
+        return await job.run()
+    finally:
+        await afmp_bridge.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("universe", choices=list(EXCHANGES))
+    parser.add_argument("--intervals", default="daily", help=f"comma-separated, from {', '.join(WINDOW_DAYS)}")
+    parser.add_argument("--from", dest="from_date", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="to_date", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--symbols", help="comma-separated subset instead of the whole universe")
+    parser.add_argument("--concurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    try:
+        status = asyncio.run(main(args))
+    except KeyboardInterrupt:
+        print("Interrupted; rerun the same command to resume.")
+        sys.exit(130)
+    print(status)
+    sys.exit(0 if status["state"] == "completed" else 1)
@@ -0,0 +1,234 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import date, timedelta
+from settings.config import settings
+from fmp.aioconnect import afmp_bridge
+from fmp.scheduler import current_priority, BACKGROUND
+from technicals.ratings import get_universe_symbols
+
+logger = logging.getLogger(__name__)
+
+# Days per historical-chart request; FMP truncates long intraday ranges
+WINDOW_DAYS = {
+    '1min': 3,
+    '5min': 10,
+    '15min': 30,
+    '30min': 60,
+    '1hour': 90,
+    '4hour': 365,
+    'daily': 1825,
+}
+
+
+def split_windows(from_date, to_date, days):
+    """Inclusive (from, to) date windows of at most `days` days covering the range."""
+    windows = []
+    start = from_date
+    while start <= to_date:
+        end = min(start + timedelta(days=days - 1), to_date)
+        windows.append((start, end))
+        start = end + timedelta(days=1)
+    return windows
+
+
+class BackfillJob:
+    """
+    Backfills bar history for a universe into the local bar store.
+
+    The range is split into (symbol, interval, window) tasks that workers pull
+    from a queue; every FMP call runs at background priority so interactive
+    requests keep their share of the rate budget. Finished and failed tasks are
+    written to a JSON checkpoint, so rerunning the same job resumes where it
+    stopped and retries the failures. `bars` counts bars fetched from FMP only.
+    """
+
+    def __init__(self, universe, intervals, from_date, to_date, concurrency=None, checkpoint_dir=None, symbols=None):
+        if not settings.BAR_STORE_ENABLED:
+            raise ValueError("Backfill writes to the bar store; set BAR_STORE_ENABLED.")
+        for interval in intervals:
+            if interval not in WINDOW_DAYS:
+                raise ValueError(f"Invalid interval '{interval}'. Choose from {', '.join(WINDOW_DAYS)}.")
+        self.universe = universe
+        self.intervals = list(intervals)
+        self.from_date = date.fromisoformat(str(from_date))
+        self.to_date = date.fromisoformat(str(to_date))
+        if self.from_date > self.to_date:
+            raise ValueError("from_date must not be after to_date.")
+        self.concurrency = concurrency or settings.BACKFILL_CONCURRENCY
+        self.symbols = list(symbols) if symbols else None
+
+        name = f"{universe}-{'_'.join(self.intervals)}-{self.from_date}-{self.to_date}"
+        self.id = name if symbols is None else f"{name}-{uuid.uuid5(uuid.NAMESPACE_URL, ','.join(self.symbols)).hex[:8]}"
+        checkpoint_dir = checkpoint_dir or os.path.join(settings.DATA_DIR, 'backfill')
+        self.checkpoint_path = os.path.join(checkpoint_dir, f"{self.id}.json")
+
+        self.state = "pending"
+        self.error = None
+        self.done = set()
+        self.failed = {}
+        self.total_tasks = 0
+        self.bars = 0
+        self.started_at = None
+        self.finished_at = None
+        self._start_bars = 0
+        self._last_checkpoint = 0.0
+
+    @staticmethod
+    def task_key(symbol, interval, window):
+        return f"{symbol}|{interval}|{window[0]}|{window[1]}"
+
+    def plan(self, symbols):
+        tasks = []
+        for interval in self.intervals:
+            windows = split_windows(self.from_date, self.to_date, WINDOW_DAYS[interval])
+            for symbol in symbols:
+                for window in windows:
+                    if self.task_key(symbol, interval, window) not in self.done:
+                        tasks.append((symbol, interval, window))
+        return tasks
+
+    # --- Checkpoints ---
+
+    def load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return False
+        self.done = set(checkpoint.get("done", []))
+        self.failed = checkpoint.get("failed", {})
+        self.bars = checkpoint.get("bars", 0)
+        return True
+
+    def save_checkpoint(self):
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        tmp = f"{self.checkpoint_path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump({
+                "universe": self.universe,
+                "intervals": self.intervals,
+                "from_date": str(self.from_date),
+                "to_date": str(self.to_date),
+                "bars": self.bars,
+                "done": sorted(self.done),
+                "failed": self.failed,
+            }, f)
+        os.replace(tmp, self.checkpoint_path)
+        self._last_checkpoint = time.monotonic()
+
+    # --- Execution ---
+
+    async def fetch(self, symbol, interval, window):
+        """Fills one window of the bar store and returns the bars fetched; days already stored are not refetched."""
+        return await afmp_bridge.fill_bar_store(symbol, interval, str(window[0]), str(window[1]))
+
+    async def _worker(self, queue):
+        while True:
+            task = await queue.get()
+            try:
+                symbol, interval, window = task
+                key = self.task_key(symbol, interval, window)
+                try:
+                    bars = await self.fetch(symbol, interval, window)
+                    self.bars += bars
+                    self.done.add(key)
+                    self.failed.pop(key, None)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.failed[key] = str(e)
+                    logger.warning(f"[Backfill] {key} failed: {e}")
+                if time.monotonic() - self._last_checkpoint > settings.BACKFILL_CHECKPOINT_SECONDS:
+                    self.save_checkpoint()
+            finally:
+                queue.task_done()
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(settings.BACKFILL_REPORT_SECONDS)
+            status = self.status()
+            logger.info(
+                f"[Backfill] {self.id}: {status['tasks_done']}/{status['tasks_total']} tasks, "
+                f"{status['bars']} bars, {status['bars_per_second']:.1f} bars/s"
+            )
+
+    async def run(self):
+        """Runs the job to completion (or cancellation) and returns its final status."""
+        current_priority.set(BACKGROUND)
+        self.state = "running"
+        self.started_at = time.time()
+        resumed = self.load_checkpoint()
+        self._start_bars = self.bars
+
+        workers, reporter = [], None
+        try:
+            symbols = self.symbols or await get_universe_symbols(self.universe)
+            tasks = self.plan(symbols)
+            self.total_tasks = len(tasks) + len(self.done)
+            logger.info(
+                f"[Backfill] {self.id}: {len(tasks)} tasks for {len(symbols)} symbols"
+                + (f" (resumed, {len(self.done)} already done)" if resumed else "")
+            )
+
+            queue = asyncio.Queue()
+            for task in tasks:
+                queue.put_nowait(task)
+            reporter = asyncio.create_task(self._report())
+            workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+            await queue.join()
+            self.state = "failed" if self.failed else "completed"
+        except asyncio.CancelledError:
+            self.state = "cancelled"
+            raise
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            logger.error(f"[Backfill] {self.id} failed: {e}")
+        finally:
+            for task in workers + ([reporter] if reporter else []):
+                task.cancel()
+            await asyncio.gather(*workers, *([reporter] if reporter else []), return_exceptions=True)
+            self.finished_at = time.time()
+            self.save_checkpoint()
+        return self.status()
+
+    def status(self):
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        fetched = self.bars - self._start_bars
+        return {
+            "id": self.id,
+            "state": self.state,
+            "universe": self.universe,
+            "intervals": self.intervals,
+            "from_date": str(self.from_date),
+            "to_date": str(self.to_date),
+            "tasks_total": self.total_tasks,
+            "tasks_done": len(self.done),
+            "tasks_failed": len(self.failed),
+            "bars": self.bars,
+            "elapsed_seconds": round(elapsed, 1),
+            "bars_per_second": fetched / elapsed if elapsed else 0.0,
+            "checkpoint": self.checkpoint_path,
+            "error": self.error,
+        }
+
+
+# Jobs started from the admin routes, by id
+backfill_jobs = {}
+
+
+def start_job(job):
+    """Runs a job on its own task unless a job with the same id is already running."""
+    current = backfill_jobs.get(job.id)
+    if current is not None and current[0].state == "running":
+        return current[0]
+    task = asyncio.create_task(job.run())
+    # Failures are recorded on the job; keep the task's exception retrieved
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    backfill_jobs[job.id] = (job, task)
+    return job
@@ -0,0 +1,55 @@
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from settings.config import settings
+from technicals.ratings import EXCHANGES
+from .job import BackfillJob, backfill_jobs, start_job
+
+def require_refresh_key(x_refresh_key: str = Header(None)):
+    """Admin routes need the REFRESH_SECRET_KEY in an X-Refresh-Key header."""
+    if not x_refresh_key or not secrets.compare_digest(x_refresh_key, settings.REFRESH_SECRET_KEY):
+        raise HTTPException(status_code=403, detail="Invalid refresh key.")
+
+backfill_router = APIRouter(dependencies=[Depends(require_refresh_key)])
+
+@backfill_router.post("/start")
+async def start_backfill(
+    UNIVERSE: str = Query(..., description="Exchange to backfill: " + ", ".join(EXCHANGES)),
+    FROM_DATE: str = Query(..., description="YYYY-MM-DD"),
+    TO_DATE: str = Query(..., description="YYYY-MM-DD"),
+    INTERVALS: str = Query("daily", description="Comma-separated intervals"),
+    SYMBOLS: str = Query(None, description="Comma-separated subset of the universe"),
+):
+    """Starts (or resumes) a backfill job in the background."""
+    if UNIVERSE not in EXCHANGES:
+        raise HTTPException(status_code=404, detail=f"Unknown universe '{UNIVERSE}'.")
+    try:
+        job = BackfillJob(
+            UNIVERSE,
+            [i.strip() for i in INTERVALS.split(",") if i.strip()],
+            FROM_DATE,
+            TO_DATE,
+            symbols=[s.strip() for s in SYMBOLS.split(",")] if SYMBOLS else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return start_job(job).status()
+
+@backfill_router.get("/jobs")
+async def list_backfills():
+    return [job.status() for job, _ in backfill_jobs.values()]
+
+@backfill_router.get("/jobs/{job_id}")
+async def get_backfill(job_id: str):
+    """Progress of a job, including bars per second."""
+    if job_id not in backfill_jobs:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return backfill_jobs[job_id][0].status()
+
+@backfill_router.post("/jobs/{job_id}/cancel")
+async def cancel_backfill(job_id: str):
+    """Stops a job; its checkpoint is kept so starting it again resumes."""
+    if job_id not in backfill_jobs:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    job, task = backfill_jobs[job_id]
+    task.cancel()
+    return {"message": f"Backfill {job_id} cancelled."}
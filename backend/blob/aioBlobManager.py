@@ -0,0 +1,94 @@
+import asyncio
+import logging
+from settings.config import settings
+from settings.lazy import lazy_import
+from .local import LocalBlobStore
+
+azure_blob_aio = lazy_import("azure.storage.blob.aio")
+azure_exceptions = lazy_import("azure.core.exceptions")
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBlobManager:
+    """
+    Async counterpart of BlobManager on azure.storage.blob.aio.
+
+    All calls share one BlobServiceClient (and its connection pool) per event
+    loop. With BLOB_LOCAL_DIR set, blobs are read from and written to that
+    directory instead, for tests and offline runs. Failures are logged and
+    reported as None/False, like BlobManager.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._client_loop = None
+        self.local = LocalBlobStore(settings.BLOB_LOCAL_DIR) if settings.BLOB_LOCAL_DIR else None
+
+    def _get_client(self):
+        """One pooled service client per event loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = azure_blob_aio.BlobServiceClient.from_connection_string(
+                settings.AZURE_STORAGE_CONNECTION_STRING
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+            self._client_loop = None
+
+    async def ensure_container_exists(self, container):
+        if self.local:
+            await asyncio.to_thread(self.local.ensure_container, container)
+            return
+        try:
+            await self._get_client().create_container(container)
+            logger.info(f"Created container '{container}'.")
+        except azure_exceptions.ResourceExistsError:
+            logger.info(f"Container '{container}' already exists.")
+        except Exception as e:
+            logger.error(f"Error creating container: {e}")
+
+    async def last_modified(self, container, blob_name):
+        """Last modification as a UNIX timestamp, or None when the blob is missing or unreadable."""
+        if self.local:
+            return await asyncio.to_thread(self.local.last_modified, container, blob_name)
+        try:
+            properties = await self._get_client().get_blob_client(container, blob_name).get_blob_properties()
+            return properties.last_modified.timestamp()
+        except Exception as e:
+            logger.info(f"Blob '{blob_name}' not found or error retrieving properties: {e}")
+            return None
+
+    async def download(self, container, blob_name):
+        """Blob contents as bytes, or None when the blob is missing or unreadable."""
+        if self.local:
+            return await asyncio.to_thread(self.local.download, container, blob_name)
+        try:
+            stream = await self._get_client().get_blob_client(container, blob_name).download_blob()
+            data = await stream.readall()
+            logger.info(f"Downloaded '{blob_name}'.")
+            return data
+        except Exception as e:
+            logger.error(f"Failed to download '{blob_name}': {e}")
+            return None
+
+    async def upload(self, container, blob_name, data):
+        """Uploads bytes, replacing the blob. Returns True on success."""
+        try:
+            if self.local:
+                await asyncio.to_thread(self.local.upload, container, blob_name, data)
+            else:
+                await self._get_client().get_blob_client(container, blob_name).upload_blob(data, overwrite=True)
+            logger.info(f"Uploaded '{blob_name}' to blob storage.")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to upload '{blob_name}': {e}")
+            return False
+
+
+ablob_manager = AsyncBlobManager()
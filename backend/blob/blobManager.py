@@ -1,10 +1,14 @@
 import csv
 import os
 import logging
-from azure.storage.blob import BlobServiceClient
-from azure.core.exceptions import ResourceExistsError
+import threading
 from settings.config import settings
+from settings.lazy import lazy_import
 from tempfile import NamedTemporaryFile
+from .local import LocalBlobStore
+
+azure_blob = lazy_import("azure.storage.blob")
+azure_exceptions = lazy_import("azure.core.exceptions")
 
 logging.getLogger("azure").setLevel(logging.WARNING)
 
@@ -12,16 +16,35 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG) 
 
 
+_service_client = None
+_service_client_lock = threading.Lock()
+
+# Filesystem stand-in for tests and offline runs
+local_store = LocalBlobStore(settings.BLOB_LOCAL_DIR) if settings.BLOB_LOCAL_DIR else None
+
+
 class BlobManager:
 
+    @staticmethod
+    def get_service_client():
+        """One BlobServiceClient (and connection pool) shared by every call; it is thread-safe."""
+        global _service_client
+        if _service_client is None:
+            with _service_client_lock:
+                if _service_client is None:
+                    _service_client = azure_blob.BlobServiceClient.from_connection_string(
+                        settings.AZURE_STORAGE_CONNECTION_STRING
+                    )
+        return _service_client
+
     @staticmethod
     def ensure_container_exists(container_name):
         try:
-            blob_service_client = BlobServiceClient.from_connection_string(settings.AZURE_STORAGE_CONNECTION_STRING)
+            blob_service_client = BlobManager.get_service_client()
             container_client = blob_service_client.get_container_client(container_name)
             container_client.create_container()
             logger.info(f"Created container '{container_name}'.")
-        except ResourceExistsError:
+        except azure_exceptions.ResourceExistsError:
             logger.info(f"Container '{container_name}' already exists.")
         except Exception as e:
             logger.error(f"Error creating container: {e}")
@@ -29,7 +52,7 @@ class BlobManager:
     @staticmethod
     def get_blob_client(container, blob_name):
         try:
-            blob_service_client = BlobServiceClient.from_connection_string(settings.AZURE_STORAGE_CONNECTION_STRING)
+            blob_service_client = BlobManager.get_service_client()
             return blob_service_client.get_blob_client(container=container, blob=blob_name)
         except Exception as e:
             logger.error(f"Failed to get blob client for '{blob_name}' in container '{container}': {e}")
@@ -38,7 +61,12 @@ class BlobManager:
     @staticmethod
     def upload_to_blob_storage(file_path, blob_name, container):
         try:
-            blob_service_client = BlobServiceClient.from_connection_string(settings.AZURE_STORAGE_CONNECTION_STRING)
+            if local_store:
+                with open(file_path, "rb") as data:
+                    local_store.upload(container, blob_name, data.read())
+                logger.info(f"Uploaded '{blob_name}' to local blob store.")
+                return
+            blob_service_client = BlobManager.get_service_client()
             blob_client = blob_service_client.get_blob_client(container, blob=blob_name)
             with open(file_path, "rb") as data:
                 blob_client.upload_blob(data, overwrite=True)
@@ -55,7 +83,14 @@ class BlobManager:
     @staticmethod
     def download_from_blob_storage(blob_name, file_path, container):
         try:
-            blob_service_client = BlobServiceClient.from_connection_string(settings.AZURE_STORAGE_CONNECTION_STRING)
+            if local_store:
+                data = local_store.download(container, blob_name)
+                if data is None:
+                    raise FileNotFoundError(f"BlobNotFound: {blob_name}")
+                with open(file_path, "wb") as download_file:
+                    download_file.write(data)
+                return True
+            blob_service_client = BlobManager.get_service_client()
             blob_client = blob_service_client.get_blob_client(container, blob=blob_name)
             with open(file_path, "wb") as download_file:
                 download_file.write(blob_client.download_blob().readall())
@@ -73,7 +108,7 @@ class BlobManager:
     @staticmethod
     def create_folder(folder_name, container):
         try:
-            blob_service_client = BlobServiceClient.from_connection_string(settings.AZURE_STORAGE_CONNECTION_STRING)
+            blob_service_client = BlobManager.get_service_client()
             blob_client = blob_service_client.get_blob_client(container, blob=f"{folder_name}/")
             blob_client.upload_blob(b"", overwrite=True)
             logger.info(f"Created folder '{folder_name}' in container '{container}'.")
@@ -82,6 +117,7 @@ class BlobManager:
      
     @staticmethod        
     def is_valid_ticker(exchange, ticker, container):
+        """Checks the ticker against the blob itself; tickers.index.ticker_index answers from memory."""
         blob_filename = f"{exchange.lower()}/{exchange.lower()}_tickers.csv"
 
         with NamedTemporaryFile(delete=False, suffix=".csv") as tmp_file:
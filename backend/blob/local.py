@@ -0,0 +1,50 @@
+import os
+import tempfile
+
+
+class LocalBlobStore:
+    """
+    Filesystem stand-in for Azure Blob Storage, enabled with BLOB_LOCAL_DIR.
+
+    Blobs live at {root}/{container}/{blob_name}; uploads are written to a
+    temp file and swapped in, so readers never see a partial blob.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, container, blob_name):
+        path = os.path.normpath(os.path.join(self.root, container, blob_name))
+        if not path.startswith(os.path.normpath(os.path.join(self.root, container)) + os.sep):
+            raise ValueError(f"Invalid blob name '{blob_name}'")
+        return path
+
+    def ensure_container(self, container):
+        os.makedirs(os.path.join(self.root, container), exist_ok=True)
+
+    def last_modified(self, container, blob_name):
+        """Modification time as a UNIX timestamp, or None when the blob does not exist."""
+        try:
+            return os.path.getmtime(self._path(container, blob_name))
+        except FileNotFoundError:
+            return None
+
+    def download(self, container, blob_name):
+        """Blob contents, or None when the blob does not exist."""
+        try:
+            with open(self._path(container, blob_name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def upload(self, container, blob_name, data):
+        path = self._path(container, blob_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
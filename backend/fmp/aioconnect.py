@@ -0,0 +1,339 @@
+import asyncio
+import os
+import logging
+import httpx
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+from settings.config import settings
+from settings.lazy import lazy_import
+from .connect import FMPDataBridge
+from .scheduler import fmp_scheduler, FMPRateLimitError
+from .singleflight import fmp_single_flight, make_key
+from .barstore import bar_store
+from .respcache import response_cache, is_cacheable
+
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+BASE_URL_V3 = f"{settings.FMP_BASE_URL.rstrip('/')}/v3/"
+BASE_URL_V4 = f"{settings.FMP_BASE_URL.rstrip('/')}/v4/"
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx when installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class AsyncFMPDataBridge:
+    """
+    Async counterpart of FMPDataBridge.
+
+    Talks to the FMP REST API directly over one pooled httpx.AsyncClient
+    (keep-alive, HTTP/2 when `h2` is installed), so routes await requests on
+    the event loop instead of hopping to a thread per fmpsdk call. Method
+    names and return shapes match FMPDataBridge.
+    """
+    TIMESERIES = FMPDataBridge.TIMESERIES
+
+    # Pure helpers are shared with the sync bridge
+    handle_data_frame = FMPDataBridge.handle_data_frame
+    frame_response = FMPDataBridge.frame_response
+    handle_fmp_error = FMPDataBridge.handle_fmp_error
+    parse_date = FMPDataBridge.parse_date
+    validate_timeseries = FMPDataBridge.validate_timeseries
+    save_data_to_csv = FMPDataBridge.save_data_to_csv
+    _split_historical = FMPDataBridge._split_historical
+    _chart_frame = FMPDataBridge._chart_frame
+    _store_daily = FMPDataBridge._store_daily
+    _read_daily = FMPDataBridge._read_daily
+    _quote_batches = FMPDataBridge._quote_batches
+    _quotes_frame = FMPDataBridge._quotes_frame
+
+    def __init__(self):
+        load_dotenv()
+        self.api_key = os.getenv("FMP_APIKEY")
+        if not self.api_key:
+            raise ValueError("API key not found. Please set it in the environment variables.")
+        self._client = None
+        self._client_loop = None
+
+    def _get_client(self):
+        """One pooled client per event loop, created on first use."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                timeout=settings.FMP_HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.FMP_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.FMP_HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.FMP_HTTP_KEEPALIVE_EXPIRY,
+                ),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+
+    async def _fetch(self, url, params):
+        response = await self._get_client().get(url, params={**params, "apikey": self.api_key})
+        response.raise_for_status()
+        if not response.content:
+            return []
+        return response.json()
+
+    async def _get(self, path, version=3, cache=None, **params):
+        """
+        GET an FMP endpoint under the shared rate limit; identical concurrent
+        requests are coalesced into one. `cache` names a response cache
+        endpoint class for rarely changing data.
+        """
+        params = {k: v for k, v in params.items() if v is not None}
+        url = (BASE_URL_V4 if version == 4 else BASE_URL_V3) + path
+        key = make_key(url, kwargs=params)
+        cache = cache if settings.RESPONSE_CACHE_ENABLED else None
+        if cache:
+            data = await asyncio.to_thread(response_cache.get, repr(key), cache)
+            if data is not None:
+                return data
+
+        data = await fmp_single_flight.do_async(key, fmp_scheduler.call_async, self._fetch, url, params)
+        if cache and is_cacheable(data):
+            await asyncio.to_thread(response_cache.put, repr(key), cache, data)
+        return data
+
+    async def _fill_chart(self, symbol, interval, from_date, to_date):
+        """Fetches the days of a historical-chart window the bar store lacks; returns the bars fetched."""
+        fetched = 0
+        # every bar store step reads or writes files; keep them off the loop
+        gaps = await asyncio.to_thread(bar_store.missing, symbol, interval, from_date, to_date)
+        for gap_from, gap_to in gaps:
+            data = await self._get(f"historical-chart/{interval}/{symbol}", **{"from": str(gap_from), "to": str(gap_to)})
+            df = self._chart_frame(data, symbol) if data else None
+            fetched += await asyncio.to_thread(bar_store.write, symbol, interval, df, gap_from, gap_to)
+        return fetched
+
+    async def _fill_daily(self, symbols, from_date, to_date):
+        """Refreshes stale daily bars with one request per distinct gap; returns the bars fetched."""
+        fetched = 0
+        for stale, gap_from, gap_to in await asyncio.to_thread(bar_store.plan_batch, symbols, 'daily', from_date, to_date):
+            data = await self._get(f"historical-price-full/{','.join(stale)}", **{"from": str(gap_from), "to": str(gap_to)})
+            fetched += await asyncio.to_thread(self._store_daily, data, stale, gap_from, gap_to)
+        return fetched
+
+    async def _stored_chart(self, symbol, interval, from_date, to_date):
+        """Serves a historical-chart window from the bar store, fetching only the missing days."""
+        await self._fill_chart(symbol, interval, from_date, to_date)
+        return await asyncio.to_thread(bar_store.read_frame, symbol, interval, from_date, to_date)
+
+    async def _stored_daily_bars(self, symbols, from_date, to_date):
+        """Serves batched daily bars from the bar store; one request refreshes every stale symbol."""
+        await self._fill_daily(symbols, from_date, to_date)
+        return await asyncio.to_thread(self._read_daily, symbols, from_date, to_date)
+
+    async def _frame(self, description, path, version=3, wrap=False, cache=None, **params):
+        """Fetches an endpoint into a DataFrame; errors other than rate limits become an empty frame."""
+        try:
+            data = await self._get(path, version, cache, **params)
+            return pd.DataFrame([data] if wrap else data)
+        except FMPRateLimitError:
+            raise
+        except Exception as e:
+            print(f"Error fetching {description}: {e}")
+            return pd.DataFrame()
+
+    # Historical prices
+    async def get_historical_intraday_data(self, symbol, exchange, interval, from_date, to_date):
+        """Fetch intraday data (e.g., 1min, 5min, 1h) from a specific date range."""
+        try:
+            if settings.BAR_STORE_ENABLED:
+                return await self._stored_chart(symbol, interval, from_date, to_date)
+
+            data = await self._get(f"historical-chart/{interval}/{symbol}", **{"from": from_date, "to": to_date})
+            if not data:
+                print(f"No data returned for {symbol} with interval '{interval}' on {exchange}")
+                return pd.DataFrame()
+            return self._chart_frame(data, symbol)
+        except FMPRateLimitError:
+            raise
+        except Exception as e:
+            print(f"Error fetching intraday data for {symbol}: {e}")
+            return pd.DataFrame()
+
+    async def get_historical_period_data(self, symbol, exchange, interval, period_days):
+        """Fetch historical data for a given period using a time interval."""
+        end_date = datetime.now().strftime('%Y-%m-%d')
+        start_date = (datetime.now() - timedelta(days=int(period_days))).strftime('%Y-%m-%d')
+        return await self.get_historical_intraday_data(symbol, exchange, interval, start_date, end_date)
+
+    async def get_historical_daily_bars(self, symbols, from_date, to_date):
+        """Fetch daily OHLC bars for several symbols in one batched request."""
+        symbols = list(symbols)
+        try:
+            if settings.BAR_STORE_ENABLED:
+                return await self._stored_daily_bars(symbols, from_date, to_date)
+
+            data = await self._get(f"historical-price-full/{','.join(symbols)}", **{"from": from_date, "to": to_date})
+            frames = []
+            for symbol, bars in self._split_historical(data, symbols):
+                df = pd.DataFrame(bars)
+                if df.empty:
+                    continue
+                df['symbol'] = symbol
+                frames.append(df)
+            if not frames:
+                return pd.DataFrame()
+            df = pd.concat(frames, ignore_index=True)
+            df['date'] = pd.to_datetime(df['date'])
+            return df
+        except FMPRateLimitError:
+            raise
+        except Exception as e:
+            print(f"Error fetching daily bars for {symbols}: {e}")
+            return pd.DataFrame()
+
+    async def fill_bar_store(self, symbol, interval, from_date, to_date):
+        """
+        Makes sure the bar store holds [from_date, to_date] for the symbol and
+        returns the number of bars fetched for it, 0 when the window was
+        already stored. Unlike the getters, errors propagate so callers such as
+        the backfill job can retry.
+        """
+        if interval == 'daily':
+            return await self._fill_daily([symbol], from_date, to_date)
+        return await self._fill_chart(symbol, interval, from_date, to_date)
+
+    async def get_quote(self, symbol):
+        return await self._frame(f"quote for {symbol}", f"quote/{symbol}")
+
+    async def get_quotes(self, symbols, fields=None, batch_size=None):
+        """
+        Bulk quotes for any number of symbols; batch requests run concurrently
+        up to FMP_QUOTE_CONCURRENCY and come back as one frame.
+        """
+        batches = self._quote_batches(symbols, batch_size)
+        if not batches:
+            return pd.DataFrame()
+        semaphore = asyncio.Semaphore(settings.FMP_QUOTE_CONCURRENCY)
+
+        async def fetch(batch):
+            async with semaphore:
+                return await self._get(f"quote/{','.join(batch)}")
+
+        results = await asyncio.gather(*(fetch(batch) for batch in batches))
+        return self._quotes_frame(results, fields)
+
+    # Stock Market Data
+    async def get_stocks_list(self):
+        return await self._frame("stocks list", "stock/list", wrap=True, cache='symbols')
+
+    async def get_company_profile(self, symbol):
+        return await self._frame(f"company profile for {symbol}", f"profile/{symbol}", wrap=True, cache='profiles')
+
+    async def get_financial_statements(self, symbol, statement_type):
+        paths = {
+            'income': 'income-statement',
+            'balance': 'balance-sheet-statement',
+            'cashflow': 'cash-flow-statement',
+        }
+        if statement_type not in paths:
+            raise ValueError("Invalid statement type. Choose from 'income', 'balance', or 'cashflow'.")
+        data = await self._get(f"{paths[statement_type]}/{symbol}", period="annual", limit=10)
+        return pd.DataFrame(data)
+
+    async def get_stock_splits_dividends(self, symbol, data_type):
+        paths = {'split': 'stock_split', 'dividend': 'stock_dividend'}
+        if data_type not in paths:
+            raise ValueError("Invalid data type. Choose from 'split' or 'dividend'.")
+        data = await self._get(f"historical-price-full/{paths[data_type]}/{symbol}")
+        return pd.DataFrame(data.get("historical", []) if isinstance(data, dict) else data)
+
+    # Forex Market
+    async def get_forex_pairs_list(self):
+        return await self._frame("available forex pairs", "symbol/available-forex-currency-pairs", cache='symbols')
+
+    async def get_forex_list(self):
+        return await self._frame("forex list", "quotes/forex", cache='listings')
+
+    async def get_forex_news(self, symbol, from_date, to_date, page, limit):
+        return await self._frame(
+            f"forex news for {symbol} from {from_date} to {to_date}", "forex_news", 4,
+            symbol=symbol, **{"from": from_date, "to": to_date}, page=page, limit=limit
+        )
+
+    # Crypto Market
+    async def get_available_crypto_pairs(self):
+        return pd.DataFrame(await self._get("symbol/available-cryptocurrencies", cache='symbols'))
+
+    async def get_cryptocurrencies_list(self):
+        return pd.DataFrame(await self._get("quotes/crypto", cache='listings'))
+
+    async def get_historical_daily_crypto_data(self, crypto_symbol):
+        return pd.DataFrame(await self._get(f"historical-price-full/{crypto_symbol}"))
+
+    async def get_crypto_news(self, news_symbol, from_date, to_date, limit):
+        data = await self._get("crypto_news", 4, symbol=news_symbol, **{"from": from_date, "to": to_date}, limit=limit)
+        return pd.DataFrame(data)
+
+    # Commodities Market
+    async def get_historical_daily_commodity_data(self, commodity_symbol):
+        return pd.DataFrame(await self._get(f"historical-price-full/{commodity_symbol}"))
+
+    async def get_available_commodities_pairs(self):
+        return pd.DataFrame(await self._get("symbol/available-commodities", cache='symbols'))
+
+    async def get_commodities_list(self):
+        return pd.DataFrame(await self._get("quotes/commodity", cache='listings'))
+
+    # ETFs
+    async def get_etf_list(self):
+        return await self._frame("ETF list", "etf/list", cache='symbols')
+
+    async def get_available_etf_pairs(self):
+        return await self._frame("available ETF pairs", "symbol/available-etfs", cache='symbols')
+
+    async def get_real_time_etf_data(self, etf_symbol):
+        return await self._frame(f"real-time ETF data for {etf_symbol}", f"quote/{etf_symbol}")
+
+    async def get_etf_info(self, etf_symbol):
+        return await self._frame(f"ETF info for {etf_symbol}", "etf-info", 4, cache='profiles', symbol=etf_symbol)
+
+    async def get_etf_sector_weightings(self, etf_symbol):
+        return await self._frame(f"ETF sector weightings for {etf_symbol}", f"etf-sector-weightings/{etf_symbol}", cache='weightings')
+
+    async def get_etf_country_weightings(self, etf_symbol):
+        return await self._frame(f"ETF country weightings for {etf_symbol}", f"etf-country-weightings/{etf_symbol}", cache='weightings')
+
+    async def get_historical_daily_eft_data(self, etf_symbol):
+        return await self._frame(f"historical daily ETF prices for {etf_symbol}", f"historical-price-full/{etf_symbol}")
+
+    async def get_etf_historical_dividends(self, etf_symbol):
+        return await self._frame(f"historical ETF dividends for {etf_symbol}", f"historical-price-full/stock_dividend/{etf_symbol}")
+
+    async def get_etf_historical_splits(self, etf_symbol):
+        return await self._frame(f"historical ETF splits for {etf_symbol}", f"historical-price-full/stock_split/{etf_symbol}")
+
+    # Technicals & COT
+    async def get_technical_indicators(self, symbol, period=10, statistics_type="SMA", time_delta="daily"):
+        return await self._frame(
+            f"technical indicators for {symbol}", f"technical_indicator/{time_delta}/{symbol}",
+            period=period, type=statistics_type
+        )
+
+    async def get_cot_list(self):
+        return await self._frame("commiment of trader list", "commitment_of_traders_report/list", 4, cache='cot')
+
+    async def get_cot_data(self, symbol, from_date, to_date):
+        return await self._frame(
+            f"cot data for {symbol}", f"commitment_of_traders_report/{symbol}", 4,
+            **{"from": from_date, "to": to_date}
+        )
+
+
+afmp_bridge = AsyncFMPDataBridge()
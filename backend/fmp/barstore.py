@@ -0,0 +1,236 @@
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime
+from urllib.parse import quote
+from settings.config import settings
+from settings.lazy import lazy_import
+from technicals.timeframes import exchange_today
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _to_day(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+def _day_seconds(value, offset=0):
+    """Naive epoch seconds at midnight of a day; bars are stored as naive wall-clock time."""
+    return (_to_day(value).toordinal() + offset - EPOCH_ORDINAL) * 86400
+
+
+def merge_ranges(ranges):
+    """Merges overlapping or adjacent inclusive [start, end] day-ordinal ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def missing_ranges(coverage, start, end):
+    """Inclusive day-ordinal ranges of [start, end] not covered by `coverage`."""
+    gaps = []
+    cursor = start
+    for lo, hi in coverage:
+        if hi < cursor:
+            continue
+        if lo > end:
+            break
+        if lo > cursor:
+            gaps.append((cursor, lo - 1))
+        cursor = max(cursor, hi + 1)
+        if cursor > end:
+            break
+    if cursor <= end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class BarStore:
+    """
+    On-disk OHLCV store partitioned by (interval, symbol).
+
+    Each partition is a directory of memory-mapped NumPy columns (`ts.npy` as
+    int64 epoch seconds plus one float64 file per OHLCV field) sorted by time,
+    and a `meta.json` listing the day ranges already fetched. Callers ask for
+    the gaps in a window, fetch only those from FMP, write them back and read
+    the window as zero-copy memmap slices.
+
+    Days before today (on the exchange clock) are final once fetched; today is
+    always reported missing so the forming bars are refreshed. A fetch that
+    returned bars covers its whole window (intraday windows only from their
+    first bar, since FMP truncates long ranges); an empty or failed response
+    covers nothing and is retried.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+        self.bars_written = 0
+
+    def _lock(self, symbol, interval):
+        key = (interval, symbol)
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def _path(self, symbol, interval, name=None):
+        path = os.path.join(self.root, interval, quote(symbol, safe=''))
+        return os.path.join(path, name) if name else path
+
+    def _load_meta(self, symbol, interval):
+        try:
+            with open(self._path(symbol, interval, 'meta.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"coverage": []}
+
+    def _load_columns(self, symbol, interval):
+        if not os.path.exists(self._path(symbol, interval, 'ts.npy')):
+            return None
+        return {
+            name: np.load(self._path(symbol, interval, f'{name}.npy'), mmap_mode='r')
+            for name in ('ts',) + COLUMNS
+        }
+
+    def _replace(self, path, array):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.save(f, array)
+        # Readers holding the old memmap keep the old inode alive
+        os.replace(tmp, path)
+
+    def missing(self, symbol, interval, from_date, to_date):
+        """Returns the (from_date, to_date) day windows that still have to be fetched."""
+        start, end = _to_day(from_date).toordinal(), _to_day(to_date).toordinal()
+        with self._lock(symbol, interval):
+            coverage = self._load_meta(symbol, interval)["coverage"]
+        gaps = missing_ranges(coverage, start, end)
+
+        today = exchange_today().toordinal()
+        if start <= today <= end and not any(lo <= today <= hi for lo, hi in gaps):
+            gaps.append((today, today))
+        return [(date.fromordinal(lo), date.fromordinal(hi)) for lo, hi in merge_ranges(gaps)]
+
+    def plan_batch(self, symbols, interval, from_date, to_date):
+        """
+        For batched endpoints: [(symbols, gap_from, gap_to)], one entry per
+        distinct gap with every symbol missing exactly that window; empty when
+        every symbol is covered.
+        """
+        groups = {}
+        for symbol in symbols:
+            for gap in self.missing(symbol, interval, from_date, to_date):
+                groups.setdefault(gap, []).append(symbol)
+        return [(stale, gap_from, gap_to) for (gap_from, gap_to), stale in sorted(groups.items())]
+
+    def write(self, symbol, interval, df, from_date, to_date):
+        """
+        Merges a fetched frame into the partition and, when it holds bars,
+        marks [from_date, to_date] as covered (intraday: from its first bar).
+        Rows already stored at the same timestamp are replaced. Returns the
+        number of bars fetched.
+        """
+        start, end = _to_day(from_date).toordinal(), _to_day(to_date).toordinal()
+        final_end = min(end, exchange_today().toordinal() - 1)
+
+        fresh = {}
+        if df is not None and not df.empty:
+            df = df.sort_values('date')
+            fresh['ts'] = pd.to_datetime(df['date']).to_numpy('datetime64[s]').astype(np.int64)
+            if interval != 'daily':
+                # FMP cuts long intraday ranges from the old end; the days before the first bar may exist
+                start = max(start, EPOCH_ORDINAL + int(fresh['ts'][0]) // 86400)
+            for name in COLUMNS:
+                fresh[name] = (
+                    df[name].to_numpy(dtype=np.float64) if name in df.columns else np.full(len(df), np.nan)
+                )
+
+        with self._lock(symbol, interval):
+            os.makedirs(self._path(symbol, interval), exist_ok=True)
+            meta = self._load_meta(symbol, interval)
+
+            if fresh:
+                current = self._load_columns(symbol, interval)
+                if current is not None and len(current['ts']):
+                    # Drop stored rows that the fetch replaces, then merge by time
+                    keep = ~np.isin(current['ts'], fresh['ts'])
+                    merged = {name: np.concatenate([current[name][keep], fresh[name]]) for name in fresh}
+                    order = np.argsort(merged['ts'], kind='stable')
+                    merged = {name: values[order] for name, values in merged.items()}
+                else:
+                    merged = fresh
+                del current
+
+                for name, values in merged.items():
+                    self._replace(self._path(symbol, interval, f'{name}.npy'), values)
+                self.bars_written += len(fresh['ts'])
+
+            if fresh and start <= final_end:
+                meta["coverage"] = merge_ranges(meta["coverage"] + [[start, final_end]])
+            tmp = self._path(symbol, interval, 'meta.json.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(meta, f)
+            os.replace(tmp, self._path(symbol, interval, 'meta.json'))
+            self.writes += 1
+        return len(fresh['ts']) if fresh else 0
+
+    def read(self, symbol, interval, from_date=None, to_date=None):
+        """
+        Returns a dict of memmap column views (ts, open, high, low, close, volume)
+        for the window, oldest first, or None when nothing is stored.
+        """
+        with self._lock(symbol, interval):
+            columns = self._load_columns(symbol, interval)
+        if columns is None:
+            return None
+        self.reads += 1
+
+        ts = columns['ts']
+        lo = 0 if from_date is None else np.searchsorted(ts, _day_seconds(from_date), 'left')
+        hi = len(ts) if to_date is None else np.searchsorted(ts, _day_seconds(to_date, 1), 'left')
+        return {name: values[lo:hi] for name, values in columns.items()}
+
+    def read_frame(self, symbol, interval, from_date=None, to_date=None):
+        """
+        The window as a DataFrame shaped like FMP's historical-chart frames
+        (newest first, with `date` and `symbol` columns).
+        """
+        bars = self.read(symbol, interval, from_date, to_date)
+        if bars is None or not len(bars['ts']):
+            return pd.DataFrame()
+        df = pd.DataFrame({name: bars[name][::-1] for name in COLUMNS})
+        df.insert(0, 'date', pd.to_datetime(bars['ts'][::-1], unit='s'))
+        df['symbol'] = symbol
+        return df
+
+    def stats(self):
+        return {
+            "root": self.root,
+            "partitions": len(self._locks),
+            "reads": self.reads,
+            "writes": self.writes,
+            "bars_written": self.bars_written,
+        }
+
+
+bar_store = BarStore(os.path.join(settings.DATA_DIR, 'bars'))
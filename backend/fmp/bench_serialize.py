@@ -0,0 +1,95 @@
+"""
+Compares handle_data_frame with the column-based frame_response encoder.
+
+    python -m fmp.bench_serialize            # synthetic stocks list
+    python -m fmp.bench_serialize --live     # real /stock/list payload from FMP
+"""
+import argparse
+import json
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from fastapi.responses import JSONResponse
+from .connect import fmp_bridge
+from .serialize import frame_response
+
+
+def synthetic_stocks_list(rows):
+    """Same shape as get_stocks_list: one row whose cells are symbol records."""
+    rng = np.random.default_rng(0)
+    prices = rng.uniform(1, 500, rows)
+    prices[rng.random(rows) < 0.02] = np.nan
+    records = [
+        {
+            "symbol": f"SYM{i}",
+            "name": f"Company {i} Inc.",
+            "price": None if np.isnan(prices[i]) else float(prices[i]),
+            "exchange": "NASDAQ Global Select",
+            "exchangeShortName": "NASDAQ",
+            "type": "stock",
+        }
+        for i in range(rows)
+    ]
+    return pd.DataFrame([records])
+
+
+def synthetic_bars(rows):
+    """A long historical-chart style frame with NaNs and a datetime column."""
+    rng = np.random.default_rng(1)
+    close = 100 + np.cumsum(rng.normal(0, 1, rows))
+    close[rng.random(rows) < 0.01] = np.nan
+    return pd.DataFrame({
+        "date": pd.date_range("2020-01-01", periods=rows, freq="h"),
+        "open": close, "high": close + 1, "low": close - 1, "close": close,
+        "volume": rng.integers(0, 10_000, rows),
+        "symbol": "EURUSD",
+    })
+
+
+def measure(fn, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(df)
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    body = fn(df)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), peak, body
+
+
+def baseline(df):
+    # What FastAPI does with the route's return value
+    return JSONResponse(fmp_bridge.handle_data_frame(df)).body
+
+
+def columnar(df):
+    return frame_response(df).body
+
+
+def run(name, df, repeat):
+    old_time, old_peak, old_body = measure(baseline, df, repeat)
+    new_time, new_peak, new_body = measure(columnar, df, repeat)
+    same = json.loads(old_body) == json.loads(new_body)
+    print(f"{name}: {df.shape[0]}x{df.shape[1]} frame, {len(new_body) / 1e6:.1f} MB body, identical={same}")
+    print(f"  handle_data_frame  {old_time * 1000:8.1f} ms   peak {old_peak / 1e6:7.1f} MB")
+    print(f"  frame_response     {new_time * 1000:8.1f} ms   peak {new_peak / 1e6:7.1f} MB")
+    print(f"  speedup x{old_time / new_time:.1f}, peak memory x{old_peak / max(new_peak, 1):.1f} lower")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="benchmark the real stocks list from FMP")
+    parser.add_argument("--rows", type=int, default=70_000, help="synthetic stocks list size")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    stocks = fmp_bridge.get_stocks_list() if args.live else synthetic_stocks_list(args.rows)
+    run("stocks-list", stocks, args.repeat)
+    run("historical bars", synthetic_bars(args.rows), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
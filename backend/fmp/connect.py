@@ -1,13 +1,37 @@
-import pandas as pd
-import numpy as np
 from fastapi.encoders import jsonable_encoder
 import os
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-import fmpsdk as fmp
 from fastapi import HTTPException
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from settings.config import settings
+from settings.lazy import lazy_import
+from .scheduler import fmp_scheduler, FMPRateLimitError
+from .singleflight import fmp_single_flight, make_key
+from .barstore import bar_store
+from .respcache import response_cache, is_cacheable
+from .serialize import frame_response
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+fmp = lazy_import("fmpsdk")
+
+
+def _apply_base_url():
+    """Points fmpsdk at settings.FMP_BASE_URL (e.g. a local stand-in) when it is overridden."""
+    base = settings.FMP_BASE_URL.rstrip('/')
+    if base == type(settings).model_fields['FMP_BASE_URL'].default:
+        # leave fmpsdk unloaded until first use when pointing at the real API
+        return
+    for module in (getattr(fmp, 'settings', None), getattr(fmp, 'url_methods', None)):
+        if module is None:
+            continue
+        for version in ('v3', 'v4'):
+            if hasattr(module, f'BASE_URL_{version}'):
+                setattr(module, f'BASE_URL_{version}', f"{base}/{version}")
+
+_apply_base_url()
 
 class FMPDataBridge:
     TIMESERIES = ['1min', '5min', '15min', '30min', '1hour', '4hour']
@@ -18,12 +42,28 @@ class FMPDataBridge:
         if not self.api_key:
             raise ValueError("API key not found. Please set it in the environment variables.")
 
+    def _request(self, fn, cache=None, **kwargs):
+        """
+        Calls an fmpsdk function through the shared rate-limit scheduler.
+        Concurrent identical calls share one upstream request and its result.
+        `cache` names a response cache endpoint class for rarely changing data.
+        """
+        key = make_key(fn.__name__, kwargs=kwargs)
+        cache = cache if settings.RESPONSE_CACHE_ENABLED else None
+        if cache:
+            data = response_cache.get(repr(key), cache)
+            if data is not None:
+                return data
+
+        data = fmp_single_flight.do(key, fmp_scheduler.call, fn, apikey=self.api_key, **kwargs)
+        if cache and is_cacheable(data):
+            response_cache.put(repr(key), cache, data)
+        return data
+
     def save_data_to_csv(self, data, symbol, period, end_date, market):
         # Create directory if it doesn't exist
-        ## change to be internal 
-        csv_dir = f'/Users/emmanuelwopara/Desktop/Code/Algo/Data/csv/{market}'
-        if not os.path.exists(csv_dir):
-            os.makedirs(csv_dir)
+        csv_dir = os.path.join(settings.DATA_DIR, 'csv', market)
+        os.makedirs(csv_dir, exist_ok=True)
         
         # Define the CSV file path
         csv_file = f"{csv_dir}/{symbol}-{period}-{end_date}.csv"
@@ -49,12 +89,67 @@ class FMPDataBridge:
         data.to_csv(csv_file, index=False)
         print(f"Data saved to {csv_file}")
      
+    def _chart_frame(self, data, symbol):
+        """historical-chart rows as a DataFrame with a parsed `date` and a `symbol` column."""
+        df = pd.DataFrame(data)
+        if 'date' in df.columns:
+            df['date'] = pd.to_datetime(df['date'])
+        elif 'timestamp' in df.columns:
+            df['date'] = pd.to_datetime(df['timestamp'], unit='s')
+        else:
+            raise KeyError("Neither 'date' nor 'timestamp' column found in the data.")
+        df['symbol'] = symbol
+        return df
+
+    def _stored_chart(self, symbol, interval, from_date, to_date):
+        """Serves a historical-chart window from the bar store, fetching only the missing days."""
+        for gap_from, gap_to in bar_store.missing(symbol, interval, from_date, to_date):
+            data = self._request(
+                fmp.historical_chart,
+                symbol=symbol,
+                time_delta=interval,
+                from_date=str(gap_from),
+                to_date=str(gap_to)
+            )
+            bar_store.write(symbol, interval, self._chart_frame(data, symbol) if data else None, gap_from, gap_to)
+        return bar_store.read_frame(symbol, interval, from_date, to_date)
+
+    def _stored_daily_bars(self, symbols, from_date, to_date):
+        """Serves batched daily bars from the bar store; one request per distinct gap refreshes the stale symbols."""
+        for stale, gap_from, gap_to in bar_store.plan_batch(symbols, 'daily', from_date, to_date):
+            data = self._request(
+                fmp.historical_price_full,
+                symbol=stale,
+                from_date=str(gap_from),
+                to_date=str(gap_to)
+            )
+            self._store_daily(data, stale, gap_from, gap_to)
+        return self._read_daily(symbols, from_date, to_date)
+
+    def _store_daily(self, data, symbols, from_date, to_date):
+        """Writes a batched daily response to the bar store; returns the number of bars fetched."""
+        fetched = {}
+        for symbol, bars in self._split_historical(data, symbols):
+            if bars:
+                df = pd.DataFrame(bars)
+                df['date'] = pd.to_datetime(df['date'])
+                fetched[symbol] = df
+        return sum(bar_store.write(symbol, 'daily', fetched.get(symbol), from_date, to_date) for symbol in symbols)
+
+    def _read_daily(self, symbols, from_date, to_date):
+        frames = [bar_store.read_frame(symbol, 'daily', from_date, to_date) for symbol in symbols]
+        frames = [df for df in frames if not df.empty]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
     def get_historical_intraday_data(self, symbol, exchange, interval, from_date, to_date):
         """Fetch intraday data (e.g., 1min, 5min, 1h) from a specific date range."""
         try:
             print(f"Fetching intraday data for {symbol} from {from_date} to {to_date} with interval '{interval}' on {exchange}")
-            data = fmp.historical_chart(
-                apikey=self.api_key,
+            if settings.BAR_STORE_ENABLED:
+                return self._stored_chart(symbol, interval, from_date, to_date)
+
+            data = self._request(
+                fmp.historical_chart,
                 symbol=symbol,
                 time_delta=interval,
                 from_date=from_date,
@@ -65,16 +160,10 @@ class FMPDataBridge:
                 print(f"No data returned for {symbol} with interval '{interval}' on {exchange}")
                 return pd.DataFrame()
 
-            df = pd.DataFrame(data)
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-            elif 'timestamp' in df.columns:
-                df['date'] = pd.to_datetime(df['timestamp'], unit='s')
-            else:
-                raise KeyError("Neither 'date' nor 'timestamp' column found in the data.")
+            return self._chart_frame(data, symbol)
 
-            df['symbol'] = symbol
-            return df
+        except FMPRateLimitError:
+            raise
 
         except Exception as e:
             print(f"Error fetching intraday data for {symbol}: {e}")
@@ -87,9 +176,11 @@ class FMPDataBridge:
             period_days = int(period_days)
             start_date = (datetime.now() - timedelta(days=period_days)).strftime('%Y-%m-%d')
             print(f"Fetching period data for {symbol} from {start_date} to {end_date} with interval '{interval}' on {exchange}")
-            
-            data = fmp.historical_chart(
-                apikey=self.api_key,
+            if settings.BAR_STORE_ENABLED:
+                return self._stored_chart(symbol, interval, start_date, end_date)
+
+            data = self._request(
+                fmp.historical_chart,
                 symbol=symbol,
                 time_delta=interval,
                 from_date=start_date,
@@ -100,22 +191,74 @@ class FMPDataBridge:
                 print(f"No data returned for {symbol} with interval '{interval}' on {exchange}")
                 return pd.DataFrame()
 
-            df = pd.DataFrame(data)
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-            elif 'timestamp' in df.columns:
-                df['date'] = pd.to_datetime(df['timestamp'], unit='s')
-            else:
-                raise KeyError("Neither 'date' nor 'timestamp' column found in the data.")
+            return self._chart_frame(data, symbol)
 
-            df['symbol'] = symbol
-            return df
+        except FMPRateLimitError:
+            raise
 
         except Exception as e:
             print(f"Error fetching period data for {symbol}: {e}")
             return pd.DataFrame()
 
-        
+    def get_historical_daily_bars(self, symbols, from_date, to_date):
+        """
+        Fetch daily OHLC bars for several symbols in one batched request.
+
+        :param symbols: list of ticker symbols
+        :param from_date: start date 'YYYY-MM-DD'
+        :param to_date: end date 'YYYY-MM-DD'
+        :return: long DataFrame with one row per (symbol, date)
+        """
+        symbols = list(symbols)
+        try:
+            if settings.BAR_STORE_ENABLED:
+                return self._stored_daily_bars(symbols, from_date, to_date)
+
+            data = self._request(
+                fmp.historical_price_full,
+                symbol=symbols,
+                from_date=from_date,
+                to_date=to_date
+            )
+            frames = []
+            for symbol, bars in self._split_historical(data, symbols):
+                df = pd.DataFrame(bars)
+                if df.empty:
+                    continue
+                df['symbol'] = symbol
+                frames.append(df)
+
+            if not frames:
+                return pd.DataFrame()
+
+            df = pd.concat(frames, ignore_index=True)
+            df['date'] = pd.to_datetime(df['date'])
+            return df
+
+        except FMPRateLimitError:
+            raise
+
+        except Exception as e:
+            print(f"Error fetching daily bars for {symbols}: {e}")
+            return pd.DataFrame()
+
+    def _split_historical(self, data, symbols):
+        """Yields (symbol, bars) from the shapes historical-price-full can return."""
+        if isinstance(data, dict):
+            if 'historicalStockList' in data:
+                data = data['historicalStockList']
+            elif 'historical' in data:
+                data = [data]
+        if not isinstance(data, list) or not data:
+            return
+
+        if 'historical' in data[0]:
+            for item in data:
+                yield item.get('symbol'), item.get('historical', [])
+        elif len(symbols) == 1:
+            # A single symbol may come back as the bare bar list
+            yield symbols[0], data
+
     def get_quote(self, symbol):
         """
         Generic function to fetch quote data for stocks, ETFs, cryptocurrencies, and commodities.
@@ -124,45 +267,80 @@ class FMPDataBridge:
         :return: DataFrame with quote data
         """
         try:
-            data = fmp.quote(apikey=self.api_key, symbol=symbol)
+            data = self._request(fmp.quote, symbol=symbol)
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching quote for {symbol}: {e}")
             return pd.DataFrame()
 
+    def _quote_batches(self, symbols, batch_size=None):
+        """Unique symbols split into comma-separated batch quote chunks."""
+        batch_size = batch_size or settings.FMP_QUOTE_BATCH_SIZE
+        symbols = list(dict.fromkeys(s for s in symbols if s))
+        return [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+
+    def _quotes_frame(self, results, fields=None):
+        """Concatenates batch quote answers into one frame, keeping only `fields` when given."""
+        rows = [row for data in results if isinstance(data, list) for row in data]
+        df = pd.DataFrame.from_records(rows)
+        if fields and not df.empty:
+            df = df[[f for f in dict.fromkeys(['symbol', *fields]) if f in df.columns]]
+        return df
+
+    def get_quotes(self, symbols, fields=None, batch_size=None):
+        """
+        Bulk quotes for any number of symbols using FMP's batch quote endpoint.
+
+        :param symbols: iterable of ticker symbols
+        :param fields: optional list of quote fields to keep (symbol is always kept)
+        :return: one DataFrame with a row per symbol
+        """
+        batches = self._quote_batches(symbols, batch_size)
+        if not batches:
+            return pd.DataFrame()
+        with ThreadPoolExecutor(max_workers=min(len(batches), settings.FMP_QUOTE_CONCURRENCY)) as pool:
+            results = list(pool.map(lambda batch: self._request(fmp.quote, symbol=','.join(batch)), batches))
+        return self._quotes_frame(results, fields)
+
     # Stock Market Data
     def get_stocks_list(self):
         try:
-            data = fmp.symbols_list(apikey=self.api_key)
+            data = self._request(fmp.symbols_list, cache='symbols')
             return pd.DataFrame([data])
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching stocks list: {e}")
             return pd.DataFrame()
         
     def get_company_profile(self, symbol):
         try:
-            data = fmp.company_profile(apikey=self.api_key, symbol=symbol)
+            data = self._request(fmp.company_profile, cache='profiles', symbol=symbol)
             return pd.DataFrame([data])
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching company profile for {symbol}: {e}")
             return pd.DataFrame()
 
     def get_financial_statements(self, symbol, statement_type):
         if statement_type == 'income':
-            data = fmp.income_statement(apikey=self.api_key, symbol=symbol)
+            data = self._request(fmp.income_statement, symbol=symbol)
         elif statement_type == 'balance':
-            data = fmp. balance_sheet_statement(apikey=self.api_key, symbol=symbol)
+            data = self._request(fmp.balance_sheet_statement, symbol=symbol)
         elif statement_type == 'cashflow':
-            data = fmp.cash_flow_statement(apikey=self.api_key, symbol=symbol)
+            data = self._request(fmp.cash_flow_statement, symbol=symbol)
         else:
             raise ValueError("Invalid statement type. Choose from 'income', 'balance', or 'cashflow'.")
         return pd.DataFrame(data)
 
     def get_stock_splits_dividends(self, symbol, data_type):
         if data_type == 'split':
-            data = fmp.historical_stock_split(apikey=self.api_key, symbol=symbol)
+            data = self._request(fmp.historical_stock_split, symbol=symbol)
         elif data_type == 'dividend':
-            data = fmp.historical_stock_dividend(apikey=self.api_key, symbol=symbol)
+            data = self._request(fmp.historical_stock_dividend, symbol=symbol)
         else:
             raise ValueError("Invalid data type. Choose from 'split' or 'dividend'.")
         return pd.DataFrame(data)
@@ -171,54 +349,60 @@ class FMPDataBridge:
     # Forex Market
     def get_forex_pairs_list(self):
         try:
-            data = fmp.available_forex(apikey=self.api_key)
+            data = self._request(fmp.available_forex, cache='symbols')
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching available forex pairs: {e}")
             return pd.DataFrame()
         
     def get_forex_list(self):
         try:
-            data = fmp.forex_list(apikey=self.api_key)
+            data = self._request(fmp.forex_list, cache='listings')
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching forex list: {e}")
             return pd.DataFrame()
     
     def get_forex_news(self, symbol, from_date, to_date, page, limit):
         try:
-            data = fmp.forex_news(apikey=self.api_key, symbol=symbol, from_date=from_date, to_date=to_date, page=page, limit=limit)
+            data = self._request(fmp.forex_news, symbol=symbol, from_date=from_date, to_date=to_date, page=page, limit=limit)
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching forex news for {symbol} from {from_date} to {to_date}: {e}")
             return pd.DataFrame()
 
     def get_available_crypto_pairs(self):
-        data = fmp.available_cryptocurrencies(apikey=self.api_key)
+        data = self._request(fmp.available_cryptocurrencies, cache='symbols')
         return pd.DataFrame(data)
     
     def get_cryptocurrencies_list(self):
-        data = fmp.cryptocurrencies_list(apikey=self.api_key)
+        data = self._request(fmp.cryptocurrencies_list, cache='listings')
         return pd.DataFrame(data)
     
     def get_historical_daily_crypto_data(self, crypto_symbol):
-        data = fmp.historical_price_full(apikey=self.api_key, symbol=crypto_symbol)
+        data = self._request(fmp.historical_price_full, symbol=crypto_symbol)
         return pd.DataFrame(data)
 
     def get_crypto_news(self, news_symbol, from_date, to_date, limit):
-        data = fmp.crypto_news(apikey=self.api_key, symbol=news_symbol, from_date=from_date, to_date=to_date, limit=limit)
+        data = self._request(fmp.crypto_news, symbol=news_symbol, from_date=from_date, to_date=to_date, limit=limit)
         return pd.DataFrame(data)
     
     def get_historical_daily_commodity_data(self, commodity_symbol):
-        data = fmp.historical_price_full(apikey=self.api_key, symbol=commodity_symbol)
+        data = self._request(fmp.historical_price_full, symbol=commodity_symbol)
         return pd.DataFrame(data)
     
     def get_available_commodities_pairs(self):
-        data = fmp.available_commodities(apikey=self.api_key)
+        data = self._request(fmp.available_commodities, cache='symbols')
         return pd.DataFrame(data)
     
     def get_commodities_list(self):
-        data = fmp.commodities_list(apikey=self.api_key)
+        data = self._request(fmp.commodities_list, cache='listings')
         return pd.DataFrame(data)
     
 
@@ -229,8 +413,10 @@ class FMPDataBridge:
         :return: DataFrame with list of ETFs
         """
         try:
-            data = fmp.etf_list(apikey=self.api_key)
+            data = self._request(fmp.etf_list, cache='symbols')
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching ETF list: {e}")
             return pd.DataFrame()
@@ -242,8 +428,10 @@ class FMPDataBridge:
         :return: DataFrame with available ETF pairs
         """
         try:
-            data = fmp.available_etfs(apikey=self.api_key)
+            data = self._request(fmp.available_etfs, cache='symbols')
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching available ETF pairs: {e}")
             return pd.DataFrame()
@@ -256,8 +444,10 @@ class FMPDataBridge:
         :return: DataFrame with real-time ETF price data
         """
         try:
-            data = fmp.etf_price_realtime(apikey=self.api_key, symbol=etf_symbol)
+            data = self._request(fmp.etf_price_realtime, symbol=etf_symbol)
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching real-time ETF data for {etf_symbol}: {e}")
             return pd.DataFrame()
@@ -270,8 +460,10 @@ class FMPDataBridge:
         :return: DataFrame with ETF information
         """
         try:
-            data = fmp.etf_info(apikey=self.api_key, symbol=etf_symbol)
+            data = self._request(fmp.etf_info, cache='profiles', symbol=etf_symbol)
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching ETF info for {etf_symbol}: {e}")
             return pd.DataFrame()
@@ -284,8 +476,10 @@ class FMPDataBridge:
         :return: DataFrame with ETF sector weightings
         """
         try:
-            data = fmp.etf_sector_weightings(apikey=self.api_key, symbol=etf_symbol)
+            data = self._request(fmp.etf_sector_weightings, cache='weightings', symbol=etf_symbol)
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching ETF sector weightings for {etf_symbol}: {e}")
             return pd.DataFrame()
@@ -298,8 +492,10 @@ class FMPDataBridge:
         :return: DataFrame with ETF country weightings
         """
         try:
-            data = fmp.etf_country_weightings(apikey=self.api_key, symbol=etf_symbol)
+            data = self._request(fmp.etf_country_weightings, cache='weightings', symbol=etf_symbol)
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching ETF country weightings for {etf_symbol}: {e}")
             return pd.DataFrame()
@@ -312,8 +508,10 @@ class FMPDataBridge:
         :return: DataFrame with historical daily ETF prices
         """
         try:
-            data = fmp.historical_price_full(apikey=self.api_key, symbol=etf_symbol)
+            data = self._request(fmp.historical_price_full, symbol=etf_symbol)
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching historical daily ETF prices for {etf_symbol}: {e}")
             return pd.DataFrame()
@@ -326,8 +524,10 @@ class FMPDataBridge:
         :return: DataFrame with historical ETF dividends
         """
         try:
-            data = fmp.historical_stock_dividend(apikey=self.api_key, symbol=etf_symbol)
+            data = self._request(fmp.historical_stock_dividend, symbol=etf_symbol)
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching historical ETF dividends for {etf_symbol}: {e}")
             return pd.DataFrame()
@@ -340,8 +540,10 @@ class FMPDataBridge:
         :return: DataFrame with historical ETF splits
         """
         try:
-            data = fmp.historical_stock_split(apikey=self.api_key, symbol=etf_symbol)
+            data = self._request(fmp.historical_stock_split, symbol=etf_symbol)
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching historical ETF splits for {etf_symbol}: {e}")
             return pd.DataFrame()
@@ -357,14 +559,16 @@ class FMPDataBridge:
         :return: DataFrame with technical indicator data
         """
         try:
-            data = fmp.technical_indicators(
-                apikey=self.api_key,
+            data = self._request(
+                fmp.technical_indicators,
                 symbol=symbol,
                 period=period,
                 statistics_type=statistics_type,
                 time_delta=time_delta
             )
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching technical indicators for {symbol}: {e}")
             return pd.DataFrame()
@@ -376,8 +580,10 @@ class FMPDataBridge:
         :param api_key
         """
         try:
-            data = fmp.commitment_of_traders_report_list(apikey=self.api_key)
+            data = self._request(fmp.commitment_of_traders_report_list, cache='cot')
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching commiment of trader list: {e}")
             return pd.DataFrame()
@@ -389,12 +595,14 @@ class FMPDataBridge:
         :param api_key
         """
         try:
-            data = fmp.commitment_of_traders_report(
-                apikey=self.api_key,
+            data = self._request(
+                fmp.commitment_of_traders_report,
                 symbol=symbol,
                 from_date=from_date,
                 to_date=to_date)
             return pd.DataFrame(data)
+        except FMPRateLimitError:
+            raise
         except Exception as e:
             print(f"Error fetching cot data for {symbol}: {e}")
             
@@ -415,6 +623,10 @@ class FMPDataBridge:
     def handle_fmp_error(self, error: Exception):
         """Handles exceptions from the FMP bridge and formats them for the API."""
         logging.info(f"FMP Bridge Error: {error}")
+        if isinstance(error, HTTPException):
+            raise error
+        if isinstance(error, FMPRateLimitError):
+            raise HTTPException(status_code=429, detail=str(error))
         raise HTTPException(status_code=500, detail=str(error))
 
     def handle_data_frame(self, data):
@@ -430,5 +642,9 @@ class FMPDataBridge:
         
         return json_safe
 
+    def frame_response(self, data, orient="records"):
+        """Returns a pre-encoded JSON response from a dataframe, encoded straight from its columns"""
+        return frame_response(data, orient)
+
             
 fmp_bridge = FMPDataBridge()
\ No newline at end of file
@@ -1,66 +1,239 @@
+import numpy as np
 import pandas as pd
 
+PRICE_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+LABEL_COLUMNS = ('symbol', 'exchange', 'timeframe')
+REQUIRED_COLUMNS = ['timestamp', 'symbol', 'exchange', 'open', 'high', 'low', 'close', 'volume', 'timeframe']
+
+
+class Bar:
+    """Lightweight view of one bar; values are read from the container's arrays on access."""
+    __slots__ = ('_prices', '_index')
+
+    def __init__(self, prices, index):
+        self._prices = prices
+        self._index = index
+
+    @property
+    def timestamp(self):
+        return int(self._prices.timestamp[self._index])
+
+    @property
+    def symbol(self):
+        return self._prices.label('symbol', self._index)
+
+    @property
+    def exchange(self):
+        return self._prices.label('exchange', self._index)
+
+    @property
+    def timeframe(self):
+        return self._prices.label('timeframe', self._index)
+
+    @property
+    def open(self):
+        return float(self._prices.open[self._index])
+
+    @property
+    def high(self):
+        return float(self._prices.high[self._index])
+
+    @property
+    def low(self):
+        return float(self._prices.low[self._index])
+
+    @property
+    def close(self):
+        return float(self._prices.close[self._index])
+
+    @property
+    def volume(self):
+        return float(self._prices.volume[self._index])
+
+    def __repr__(self):
+        return (f"Bar({self.symbol} {pd.Timestamp(self.timestamp, unit='s')} "
+                f"O={self.open} H={self.high} L={self.low} C={self.close} V={self.volume})")
+
+
 class PriceData:
-    def __init__(self, data):
-        self.data = self.validate_and_prepare_data(data)
+    """
+    Columnar OHLCV container.
 
-    def validate_and_prepare_data(self, data):
+    Timestamps are int64 epoch seconds sorted ascending, prices and volume are
+    contiguous float64 arrays, and symbol/exchange/timeframe are stored as
+    int32 category codes. Time-range slices share the parent's arrays.
+    """
+    __slots__ = ('timestamp', 'open', 'high', 'low', 'close', 'volume', 'codes', 'categories')
+
+    def __init__(self, data):
         if not isinstance(data, pd.DataFrame):
             raise ValueError("Input data must be a pandas DataFrame.")
+        self._set(**self.validate_and_prepare_data(data))
+
+    def _set(self, timestamp, open, high, low, close, volume, codes, categories):
+        self.timestamp = timestamp
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.codes = codes              # column -> int32 codes
+        self.categories = categories    # column -> array of labels
 
-        if 'date' in data.columns:
-            data.rename(columns={'date': 'timestamp'}, inplace=True)
+    @classmethod
+    def _from_columns(cls, **columns):
+        prices = cls.__new__(cls)
+        prices._set(**columns)
+        return prices
 
-        required_columns = ['timestamp', 'symbol', 'exchange', 'open', 'high', 'low', 'close', 'volume', 'timeframe']
-        if not all(col in data.columns for col in required_columns):
-            missing_cols = [col for col in required_columns if col not in data.columns]
+    def validate_and_prepare_data(self, data):
+        """Validates the frame without mutating it and returns its sorted columns."""
+        columns = {'timestamp' if c == 'date' else c: c for c in data.columns}
+        missing_cols = [col for col in REQUIRED_COLUMNS if col not in columns]
+        if missing_cols:
             raise ValueError(f"Missing required columns: {missing_cols}")
 
         try:
-            data['timestamp'] = pd.to_datetime(data['timestamp'])
+            timestamp = pd.to_datetime(data[columns['timestamp']]).to_numpy('datetime64[s]').astype(np.int64)
         except (TypeError, ValueError) as e:
             raise ValueError(f"Invalid timestamp format: {e}")
 
-        for col in ['open', 'high', 'low', 'close', 'volume']:
-            data[col] = pd.to_numeric(data[col], errors='coerce').fillna(0) 
+        frame = data[[columns[c] for c in PRICE_COLUMNS]]
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes):
+            frame = frame.apply(pd.to_numeric, errors='coerce')
+        values = frame.to_numpy(dtype=np.float64).T.copy()
+        values[np.isnan(values)] = 0
+
+        order = np.argsort(timestamp, kind='stable')
+        prepared = {'timestamp': timestamp[order]}
+        for name, column in zip(PRICE_COLUMNS, values):
+            prepared[name] = column[order]
+
+        codes, categories = {}, {}
+        for name in LABEL_COLUMNS:
+            column_codes, labels = pd.factorize(data[columns[name]], use_na_sentinel=True)
+            codes[name] = column_codes.astype(np.int32)[order]
+            categories[name] = np.asarray(labels, dtype=object)
+        prepared['codes'] = codes
+        prepared['categories'] = categories
+        return prepared
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._from_columns(
+                **{name: getattr(self, name)[key] for name in ('timestamp',) + PRICE_COLUMNS},
+                codes={name: codes[key] for name, codes in self.codes.items()},
+                categories=self.categories,
+            )
+        return Bar(self, range(len(self))[key])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield Bar(self, index)
+
+    def label(self, column, index):
+        code = self.codes[column][index]
+        return None if code < 0 else self.categories[column][code]
 
-        return data.set_index('timestamp')
+    def labels(self, column):
+        """The full label column, materialized from its codes."""
+        codes = self.codes[column]
+        out = self.categories[column].take(np.maximum(codes, 0)) if len(self.categories[column]) else np.full(len(codes), None, dtype=object)
+        out[codes < 0] = None
+        return out
+
+    def between(self, start=None, end=None):
+        """Bars with start <= timestamp < end (epoch seconds or anything pandas parses), without copying."""
+        lo = 0 if start is None else np.searchsorted(self.timestamp, _epoch_seconds(start), 'left')
+        hi = len(self) if end is None else np.searchsorted(self.timestamp, _epoch_seconds(end), 'left')
+        return self[lo:hi]
+
+    def for_symbol(self, symbol):
+        matches = np.flatnonzero(self.categories['symbol'] == symbol)
+        if not len(matches):
+            return self[0:0]
+        index = np.flatnonzero(self.codes['symbol'] == matches[0])
+        return self._from_columns(
+            **{name: getattr(self, name)[index] for name in ('timestamp',) + PRICE_COLUMNS},
+            codes={name: codes[index] for name, codes in self.codes.items()},
+            categories=self.categories,
+        )
+
+    @property
+    def nbytes(self):
+        arrays = [getattr(self, name) for name in ('timestamp',) + PRICE_COLUMNS] + list(self.codes.values())
+        return sum(a.nbytes for a in arrays)
+
+    def to_records(self):
+        """NumPy record array of the bars (labels resolved to strings)."""
+        names = ['timestamp', *LABEL_COLUMNS, *PRICE_COLUMNS]
+        columns = [self.timestamp, *(self.labels(n) for n in LABEL_COLUMNS), *(getattr(self, n) for n in PRICE_COLUMNS)]
+        return np.rec.fromarrays(columns, names=names)
+
+    def to_arrow(self):
+        """pyarrow Table; numeric columns are wrapped without copying, labels become dictionary arrays."""
+        import pyarrow as pa
+
+        arrays = {'timestamp': pa.array(self.timestamp, type=pa.timestamp('s'))}
+        for name in LABEL_COLUMNS:
+            codes = self.codes[name]
+            arrays[name] = pa.DictionaryArray.from_arrays(
+                pa.array(codes, mask=codes < 0), pa.array(self.categories[name].tolist(), type=pa.string())
+            )
+        for name in PRICE_COLUMNS:
+            arrays[name] = pa.array(getattr(self, name))
+        return pa.table(arrays)
+
+    @property
+    def data(self):
+        """The bars as a DataFrame indexed by timestamp, as earlier versions exposed."""
+        frame = pd.DataFrame({
+            name: pd.Categorical.from_codes(self.codes[name], self.categories[name]) for name in LABEL_COLUMNS
+        })
+        for name in PRICE_COLUMNS:
+            frame[name] = getattr(self, name)
+        frame.index = pd.DatetimeIndex(pd.to_datetime(self.timestamp, unit='s'), name='timestamp')
+        return frame[['symbol', 'exchange', 'open', 'high', 'low', 'close', 'volume', 'timeframe']]
 
     def __str__(self):
-        if self.data is None:
+        if not len(self):
             return "No data to display."
 
         header = ["Timestamp", "Symbol", "Exchange", "Open", "High", "Low", "Close", "Volume", "Timeframe"]
-        data_list = []
-        for index, row in self.data.reset_index().iterrows():
-            data_list.append([
-                str(row['timestamp']),
-                row['symbol'],
-                row['exchange'],
-                row['open'],
-                row['high'],
-                row['low'],
-                row['close'],
-                row['volume'],
-                row['timeframe']
-            ])
-
-        max_lengths = [max(len(str(item)) for item in col) for col in zip(*([header] + data_list))]
-        formatted_header = " | ".join(name.ljust(length) for name, length in zip(header, max_lengths))
-        formatted_rows = [" | ".join(str(item).ljust(length) for item, length in zip(row, max_lengths)) for row in data_list]
+        columns = [
+            np.datetime_as_string(self.timestamp.astype('datetime64[s]'), unit='s').astype(object),
+            self.labels('symbol'),
+            self.labels('exchange'),
+            *(getattr(self, name).astype(str).astype(object) for name in PRICE_COLUMNS),
+            self.labels('timeframe'),
+        ]
+        columns = [column.astype(str) for column in columns]
+        widths = [max(len(name), int(np.char.str_len(column).max())) for name, column in zip(header, columns)]
+        padded = [np.char.ljust(column, width) for column, width in zip(columns, widths)]
 
+        formatted_header = " | ".join(name.ljust(width) for name, width in zip(header, widths))
+        formatted_rows = [" | ".join(row) for row in zip(*(column.tolist() for column in padded))]
         return "\n".join([formatted_header] + formatted_rows)
 
     def iterrows(self):
-        for index, row in self.data.iterrows():
+        for bar in self:
             yield {
-                'timestamp': index,
-                'symbol': row['symbol'],
-                'exchange': row['exchange'],
-                'open': row['open'],
-                'high': row['high'],
-                'low': row['low'],
-                'close': row['close'],
-                'volume': row['volume'],
-                'timeframe': row['timeframe']
-            }
\ No newline at end of file
+                'timestamp': pd.Timestamp(bar.timestamp, unit='s'),
+                'symbol': bar.symbol,
+                'exchange': bar.exchange,
+                'open': bar.open,
+                'high': bar.high,
+                'low': bar.low,
+                'close': bar.close,
+                'volume': bar.volume,
+                'timeframe': bar.timeframe
+            }
+
+
+def _epoch_seconds(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(pd.Timestamp(value).to_datetime64().astype('datetime64[s]').astype(np.int64))
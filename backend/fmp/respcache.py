@@ -0,0 +1,139 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds a response stays fresh, per endpoint class
+ENDPOINT_TTLS = {
+    'symbols': 86400,           # available-* pairs, stock and ETF lists
+    'listings': 3600,           # forex/commodity/crypto lists (carry a price snapshot)
+    'profiles': 86400,          # company profiles, ETF info
+    'weightings': 7 * 86400,    # ETF sector/country weightings
+    'cot': 7 * 86400,           # COT report list
+}
+
+
+def is_cacheable(data):
+    """Only non-empty answers are cached; FMP reports errors as an 'Error Message' body."""
+    if not data:
+        return False
+    return not (isinstance(data, dict) and "Error Message" in data)
+
+
+class ResponseCache:
+    """
+    Disk-backed cache of decoded FMP JSON responses.
+
+    Entries live in a SQLite file so they survive restarts; payloads are
+    zlib-compressed JSON. Each entry belongs to an endpoint class that sets
+    its TTL, and the least recently used entries are evicted once the total
+    compressed size passes `max_bytes`.
+    """
+
+    def __init__(self, path, max_bytes, ttls=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self._lock = threading.Lock()
+        self._conn = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, endpoint_class TEXT NOT NULL, stored_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL, size INTEGER NOT NULL, payload BLOB NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key, endpoint_class):
+        """Returns the cached response, or None when missing or older than the class TTL."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT stored_at, payload FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[0] > self.ttls[endpoint_class]:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            conn.commit()
+            self.hits += 1
+            payload = row[1]
+        return json.loads(zlib.decompress(payload))
+
+    def put(self, key, endpoint_class, data):
+        payload = zlib.compress(json.dumps(data).encode())
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, endpoint_class, now, now, len(payload), payload),
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def invalidate(self, *endpoint_classes):
+        """Drops every entry of the given endpoint classes, or everything when none are given."""
+        with self._lock:
+            conn = self._connect()
+            if endpoint_classes:
+                marks = ",".join("?" * len(endpoint_classes))
+                removed = conn.execute(
+                    f"DELETE FROM responses WHERE endpoint_class IN ({marks})", endpoint_classes
+                ).rowcount
+            else:
+                removed = conn.execute("DELETE FROM responses").rowcount
+            conn.commit()
+        logger.info(f"[ResponseCache] Invalidated {removed} entries {endpoint_classes or '(all)'}")
+        return removed
+
+    def stats(self):
+        with self._lock:
+            conn = self._connect()
+            rows = conn.execute(
+                "SELECT endpoint_class, COUNT(*), SUM(size) FROM responses GROUP BY endpoint_class"
+            ).fetchall()
+        return {
+            "path": self.path,
+            "max_bytes": self.max_bytes,
+            "classes": {cls: {"entries": count, "bytes": size} for cls, count, size in rows},
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+response_cache = ResponseCache(
+    path=os.path.join(settings.DATA_DIR, 'responses.sqlite3'),
+    max_bytes=settings.RESPONSE_CACHE_MAX_MB * 1024 * 1024,
+)
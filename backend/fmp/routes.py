@@ -0,0 +1,27 @@
+from fastapi import APIRouter
+from .scheduler import fmp_scheduler
+from .singleflight import fmp_single_flight
+from .barstore import bar_store
+from .respcache import response_cache
+
+fmp_router = APIRouter()
+
+@fmp_router.get("/scheduler")
+async def get_scheduler_stats():
+    """Token bucket state, queue depth and wait times of the FMP request scheduler."""
+    return fmp_scheduler.stats()
+
+@fmp_router.get("/singleflight")
+async def get_single_flight_stats():
+    """How many FMP calls ran upstream versus were shared with an identical in-flight call."""
+    return fmp_single_flight.stats()
+
+@fmp_router.get("/barstore")
+async def get_bar_store_stats():
+    """Reads and writes served by the local OHLC bar store."""
+    return bar_store.stats()
+
+@fmp_router.get("/respcache")
+async def get_response_cache_stats():
+    """Entries, size and hit rate of the FMP reference response cache."""
+    return response_cache.stats()
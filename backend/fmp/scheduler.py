@@ -0,0 +1,225 @@
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from settings.config import settings
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+# Priority of FMP calls made from the current task/thread; copied into asyncio.to_thread
+current_priority = contextvars.ContextVar("fmp_priority", default=INTERACTIVE)
+
+
+class FMPRateLimitError(Exception):
+    """Raised when FMP keeps answering 429 after every retry."""
+
+
+class FMPRequestScheduler:
+    """
+    Central gate for every FMP request.
+
+    A token bucket sized to the plan quota admits requests. Background requests
+    only take a token when no interactive request is waiting, so user-facing
+    calls jump the queue. Rate-limit answers are retried with jittered
+    exponential backoff. Works for both sync (thread) and async callers.
+    """
+
+    def __init__(self, requests_per_minute=300, burst=20, max_concurrency=10, max_retries=4,
+                 backoff_base=1.0, backoff_cap=30.0):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._semaphore = None
+        self._semaphore_loop = None
+
+        self.waiting = {p: 0 for p in PRIORITIES}
+        self.granted = {p: 0 for p in PRIORITIES}
+        self.wait_seconds = {p: 0.0 for p in PRIORITIES}
+        self.max_wait_seconds = {p: 0.0 for p in PRIORITIES}
+        self.rate_limited = 0
+        self.retries = 0
+        self.failures = 0
+
+    # --- Token bucket ---
+
+    def _try_acquire(self, priority):
+        """Takes a token if allowed; otherwise returns the seconds to wait before retrying."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            if priority == BACKGROUND and self.waiting[INTERACTIVE] > 0:
+                return max(1.0 / self.rate, 0.05)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def _enter(self, priority):
+        with self._lock:
+            self.waiting[priority] += 1
+
+    def _leave(self, priority, waited):
+        with self._lock:
+            self.waiting[priority] -= 1
+            self.granted[priority] += 1
+            self.wait_seconds[priority] += waited
+            self.max_wait_seconds[priority] = max(self.max_wait_seconds[priority], waited)
+
+    def acquire(self, priority=None):
+        """Blocks the calling thread until a token is granted."""
+        priority = priority or current_priority.get()
+        started = time.monotonic()
+        self._enter(priority)
+        try:
+            while True:
+                wait = self._try_acquire(priority)
+                if wait == 0:
+                    return
+                time.sleep(wait)
+        finally:
+            self._leave(priority, time.monotonic() - started)
+
+    async def acquire_async(self, priority=None):
+        """Waits on the event loop until a token is granted."""
+        priority = priority or current_priority.get()
+        started = time.monotonic()
+        self._enter(priority)
+        try:
+            while True:
+                wait = self._try_acquire(priority)
+                if wait == 0:
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            self._leave(priority, time.monotonic() - started)
+
+    # --- Requests ---
+
+    @staticmethod
+    def is_rate_limited(result):
+        """FMP answers 429s with an 'Error Message' body rather than an exception."""
+        if isinstance(result, dict):
+            message = str(result.get("Error Message", ""))
+            return "Limit" in message or "429" in message
+        return False
+
+    def backoff(self, attempt):
+        """Full-jitter exponential backoff in seconds."""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Runs a blocking FMP request under the rate limit, retrying 429s.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+            try:
+                result = fn(*args, **kwargs)
+                limited = self.is_rate_limited(result)
+            except Exception as e:
+                if "429" not in str(e):
+                    raise
+                limited = True
+
+            if not limited:
+                return result
+
+            self.rate_limited += 1
+            if attempt < self.max_retries:
+                self.retries += 1
+                delay = self.backoff(attempt)
+                logger.warning(f"[FMPScheduler] Rate limited on {getattr(fn, '__name__', fn)}, retrying in {delay:.2f}s")
+                time.sleep(delay)
+
+        self.failures += 1
+        raise FMPRateLimitError(f"FMP rate limit exceeded for {getattr(fn, '__name__', fn)}")
+
+    async def call_async(self, fn, *args, **kwargs):
+        """
+        Awaits a coroutine FMP request under the rate limit and the shared
+        concurrency limit, retrying 429s.
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.acquire_async()
+            try:
+                # held for the request only, not across the backoff
+                async with self._get_semaphore():
+                    result = await fn(*args, **kwargs)
+                limited = self.is_rate_limited(result)
+            except Exception as e:
+                if "429" not in str(e):
+                    raise
+                limited = True
+
+            if not limited:
+                return result
+
+            self.rate_limited += 1
+            if attempt < self.max_retries:
+                self.retries += 1
+                delay = self.backoff(attempt)
+                logger.warning(f"[FMPScheduler] Rate limited on {getattr(fn, '__name__', fn)}, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        self.failures += 1
+        raise FMPRateLimitError(f"FMP rate limit exceeded for {getattr(fn, '__name__', fn)}")
+
+    def _get_semaphore(self):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def run(self, fn, *args, priority=None, **kwargs):
+        """
+        Runs a blocking FMPDataBridge method in a worker thread, bounded by the
+        shared concurrency limit and tagged with `priority`.
+        """
+        token = current_priority.set(priority) if priority else None
+        try:
+            async with self._get_semaphore():
+                return await asyncio.to_thread(fn, *args, **kwargs)
+        finally:
+            if token is not None:
+                current_priority.reset(token)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "tokens": round(min(self.capacity, self._tokens + (time.monotonic() - self._updated) * self.rate), 2),
+                "capacity": self.capacity,
+                "requests_per_minute": self.rate * 60,
+                "queue_depth": dict(self.waiting),
+                "granted": dict(self.granted),
+                "avg_wait_seconds": {
+                    p: self.wait_seconds[p] / self.granted[p] if self.granted[p] else 0.0 for p in PRIORITIES
+                },
+                "max_wait_seconds": dict(self.max_wait_seconds),
+                "rate_limited": self.rate_limited,
+                "retries": self.retries,
+                "failures": self.failures,
+            }
+
+
+fmp_scheduler = FMPRequestScheduler(
+    requests_per_minute=settings.FMP_REQUESTS_PER_MINUTE,
+    burst=settings.FMP_BURST,
+    max_concurrency=settings.FMP_MAX_CONCURRENCY,
+    max_retries=settings.FMP_MAX_RETRIES,
+)
@@ -0,0 +1,79 @@
+import datetime
+import msgspec
+from fastapi import HTTPException
+from fastapi.responses import Response
+from settings.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+def _enc_hook(value):
+    """Types msgspec does not encode natively; missing markers become null."""
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    raise NotImplementedError(f"Cannot encode objects of type {type(value)}")
+
+
+_encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+
+def encode_json(value):
+    """Encodes plain Python (and NumPy/pandas scalar) values to JSON bytes."""
+    return _encoder.encode(value)
+
+
+def _column_values(column):
+    """
+    A column as a list of JSON-ready Python values. Float NaN/inf pass through
+    (msgspec writes them as null); datetimes are formatted once per column.
+    """
+    if pd.api.types.is_datetime64_any_dtype(column.dtype):
+        values = np.array(column.dt.strftime('%Y-%m-%dT%H:%M:%S'), dtype=object)
+        values[column.isna().to_numpy()] = None
+        return values.tolist()
+    if column.dtype == object:
+        return column.tolist()
+    if not isinstance(column.dtype, np.dtype):
+        # Extension dtypes (nullable ints, strings, categoricals): pd.NA -> None
+        return column.astype(object).where(column.notna(), None).tolist()
+    return column.to_numpy().tolist()
+
+
+def encode_records(df):
+    """
+    Encodes a frame as a JSON array of records straight from its columns,
+    without the intermediate replace/to_dict/jsonable_encoder copies.
+    """
+    names = [str(name) if not isinstance(name, (str, int)) else name for name in df.columns]
+    if all(dtype == object for dtype in df.dtypes):
+        # Wide object frames (e.g. the stocks list: one row of symbol records)
+        rows = df.to_numpy(dtype=object).tolist()
+    else:
+        rows = zip(*[_column_values(df.iloc[:, i]) for i in range(df.shape[1])])
+    return _encoder.encode([dict(zip(names, row)) for row in rows])
+
+
+def encode_columns(df):
+    """Encodes a frame as a JSON object of column name -> values."""
+    return _encoder.encode({str(name): _column_values(df.iloc[:, i]) for i, name in enumerate(df.columns)})
+
+
+def frame_response(df, orient="records"):
+    """
+    Pre-encoded JSON response for a DataFrame. The default records layout
+    matches the output of FMPDataBridge.handle_data_frame; `orient="columns"`
+    sends one array per column.
+    """
+    if df.empty:
+        raise HTTPException(status_code=404, detail="Data not found.")
+    content = encode_columns(df) if orient == "columns" else encode_records(df)
+    return Response(content=content, media_type="application/json")
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+
+def make_key(name, args=(), kwargs=None):
+    """Hashable key for a call; lists and dicts are frozen."""
+    def freeze(value):
+        if isinstance(value, (list, tuple)):
+            return tuple(freeze(v) for v in value)
+        if isinstance(value, dict):
+            return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+        if isinstance(value, set):
+            return tuple(sorted(freeze(v) for v in value))
+        return value
+    return (name, freeze(args), freeze(kwargs or {}))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is
+    in flight wait and receive the same result (or exception). Nothing is
+    cached once the call completes. `do` serves threads, `do_async` serves
+    coroutines on the event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = {}
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def do_async(self, key, fn, *args, **kwargs):
+        loop_key = (id(asyncio.get_running_loop()), key)
+        future = self._async_calls.get(loop_key)
+        if future is not None:
+            self.shared += 1
+            return await asyncio.shield(future)
+
+        self.executed += 1
+        future = asyncio.ensure_future(fn(*args, **kwargs))
+        self._async_calls[loop_key] = future
+        future.add_done_callback(lambda f: self._async_calls.pop(loop_key, None))
+        return await asyncio.shield(future)
+
+    def stats(self):
+        return {
+            "in_flight": len(self._calls) + len(self._async_calls),
+            "executed": self.executed,
+            "shared": self.shared,
+        }
+
+
+fmp_single_flight = SingleFlight()
@@ -1,24 +1,51 @@
+import time
+IMPORT_STARTED = time.perf_counter()
+
 import json
 import logging
 import asyncio
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
 from settings.config import settings
+from settings.lazy import preload
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.cors import CORSMiddleware
 from tickers import initialize_tickers, fetch_cot_list
 from tickers.routes import ticker_router
 from technicals.routes import technicals_router
+from fmp.routes import fmp_router
+from quotes.routes import quotes_router
+from backfill.routes import backfill_router
+from fmp.aioconnect import afmp_bridge
+from blob.aioBlobManager import ablob_manager
+from technicals.scheduler import ratings_scheduler
+from technicals.sharding import shutdown_executor
+from technicals.live import live_indicators
 from wsocket.manager import WebSocketManager
 from wsocket.listener import FMPListener
 from wsocket.subsciber import SubscriptionManager
 
 # Initialize components
 subscription_manager = SubscriptionManager()
-websocket_manager = WebSocketManager(subscription_manager)
+websocket_manager = WebSocketManager(subscription_manager, live_indicators)
+if settings.LIVE_RATINGS_PUSH:
+    live_indicators.add_listener(websocket_manager.push_rating)
 
 # Exchanges to support
 EXCHANGES = ["company", "crypto", "forex"]
 
+# Imported lazily (settings.lazy) and loaded by the warm-up once the app is serving
+HEAVY_MODULES = ["numpy", "pandas", "fmpsdk", "azure.storage.blob", "azure.storage.blob.aio", "azure.core.exceptions"]
+
+# Cold-start timings in seconds since main.py started importing, served by /ready
+startup_state = {
+    "ready": False,
+    "import_seconds": None,
+    "warmup": {},
+    "ready_seconds": None,
+    "first_request_seconds": None,
+}
+
 # Config logging
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
@@ -32,6 +59,24 @@ app = FastAPI(title="Market-Sceener")
 # --- Middleware Configuration ---
 origins = settings.ALLOWED_ORIGINS.split(",")
 
+class FirstRequestTimer:
+    """Records when the first response starts going out, for cold-start measurements."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or startup_state["first_request_seconds"] is not None:
+            return await self.app(scope, receive, send)
+
+        async def timed_send(message):
+            if message["type"] == "http.response.start" and startup_state["first_request_seconds"] is None:
+                startup_state["first_request_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 3)
+                logging.info(f"First request served {startup_state['first_request_seconds']}s after import")
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
+
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
 app.add_middleware(
     CORSMiddleware,
@@ -40,25 +85,70 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(FirstRequestTimer)
 
 @app.get("/")
 def read_root():
     return {"message": "Market-Sceener API"}
 
 # --- Start up & Shut Down --
+async def _timed(step, coro):
+    started = time.perf_counter()
+    try:
+        await coro
+        startup_state["warmup"][step] = {"seconds": round(time.perf_counter() - started, 3), "ok": True}
+    except Exception as e:
+        logging.error(f"Warm-up step '{step}' failed: {e}")
+        startup_state["warmup"][step] = {"seconds": round(time.perf_counter() - started, 3), "ok": False, "error": str(e)}
+
+async def warm_up():
+    """
+    Loads heavy modules and refreshes ticker/COT blobs in parallel while the
+    app already serves requests; a request that needs a module first simply
+    waits for its import. /ready reports when done.
+    """
+    await asyncio.gather(
+        _timed("modules", asyncio.to_thread(preload, *HEAVY_MODULES)),
+        _timed("tickers", initialize_tickers()),
+        _timed("cot", fetch_cot_list()),
+    )
+    if settings.RATINGS_SCHEDULER_ENABLED:
+        ratings_scheduler.start()
+    startup_state["ready_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 3)
+    startup_state["ready"] = True
+    logging.info(f"Warm-up finished {startup_state['ready_seconds']}s after import: {startup_state['warmup']}")
+
 @app.on_event("startup")
 async def on_startup():
-    await asyncio.gather(initialize_tickers(), fetch_cot_list())
+    startup_state["import_seconds"] = round(time.perf_counter() - IMPORT_STARTED, 3)
+    app.state.warm_up = asyncio.create_task(warm_up())
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if not app.state.warm_up.done():
+        app.state.warm_up.cancel()
+    await ratings_scheduler.stop()
+    shutdown_executor()
+    await afmp_bridge.aclose()
+    await ablob_manager.aclose()
 
 # --- API Routes Inclusion ---
 app.include_router(ticker_router, prefix='/tickers')
 app.include_router(technicals_router, prefix='/technicals')
+app.include_router(fmp_router, prefix='/fmp')
+app.include_router(quotes_router, prefix='/quotes')
+app.include_router(backfill_router, prefix='/backfill')
 
 # --- Health Check and Root Endpoints ---
 @app.get("/ping")
 async def health_check():
     return {"message": "pong"} 
 
+@app.get("/ready")
+async def readiness_check():
+    """200 once the startup warm-up has finished, 503 before; includes cold-start timings."""
+    return JSONResponse(startup_state, status_code=200 if startup_state["ready"] else 503)
+
 ## -- Websocket --
 @app.on_event("startup")
 async def startup():
@@ -66,10 +156,16 @@ async def startup():
         listener = FMPListener(
             exchange=exchange,
             subscription_manager=subscription_manager,
-            websocket_manager=websocket_manager
+            websocket_manager=websocket_manager,
+            live_indicators=live_indicators
         )
         asyncio.create_task(listener.start())
 
+@app.get("/ws/stats")
+async def websocket_stats():
+    """Fan-out totals and per-client sent/conflated/dropped counters."""
+    return websocket_manager.snapshot()
+
 @app.websocket("/ws")
 async def market_ws(websocket: WebSocket):
     await websocket_manager.connect(websocket)
@@ -81,4 +177,4 @@ async def market_ws(websocket: WebSocket):
         websocket_manager.disconnect(websocket)
     except Exception as e:
         websocket_manager.disconnect(websocket)
-        print(f"WebSocket error: {e}")
\ No newline at end of file
+        logger.error(f"WebSocket error: {e}")
\ No newline at end of file
@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Query, HTTPException
+from fmp.aioconnect import afmp_bridge
+from technicals.ratings import EXCHANGES, get_universe_symbols
+
+quotes_router = APIRouter()
+
+@quotes_router.get("")
+async def get_quotes(
+    SYMBOLS: str = Query(None, description="Comma-separated symbols"),
+    EXCHANGE: str = Query(None, description="Quote every symbol of an exchange: " + ", ".join(EXCHANGES)),
+    FIELDS: str = Query(None, description="Comma-separated quote fields to return; symbol is always included"),
+    FORMAT: str = Query("records", description="'records' for a list of rows, 'columns' for one array per field"),
+):
+    """Bulk quotes for any set of symbols, fetched in concurrent batch requests."""
+    if FORMAT not in ("records", "columns"):
+        raise HTTPException(status_code=400, detail="FORMAT must be 'records' or 'columns'.")
+    if EXCHANGE is not None and EXCHANGE not in EXCHANGES:
+        raise HTTPException(status_code=404, detail=f"Unknown exchange '{EXCHANGE}'.")
+
+    symbols = [s.strip() for s in SYMBOLS.split(",")] if SYMBOLS else []
+    if EXCHANGE:
+        symbols += await get_universe_symbols(EXCHANGE)
+    if not symbols:
+        raise HTTPException(status_code=400, detail="Provide SYMBOLS or EXCHANGE.")
+
+    fields = [f.strip() for f in FIELDS.split(",") if f.strip()] if FIELDS else None
+    try:
+        data = await afmp_bridge.get_quotes(symbols, fields)
+        return afmp_bridge.frame_response(data, FORMAT)
+    except Exception as e:
+        afmp_bridge.handle_fmp_error(e)
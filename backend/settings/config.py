@@ -9,7 +9,70 @@ class Settings(BaseSettings):
     AZURE_STORAGE_CONNECTION_STRING: str
     FMP_APIKEY: str
     REFRESH_SECRET_KEY: str
-    
+
+    # FMP endpoints; point these at a local stand-in (python -m standin) for offline runs
+    FMP_BASE_URL: str = "https://financialmodelingprep.com/api"
+    FMP_WS_URLS: str = ""       # overrides as "forex=ws://127.0.0.1:8765/ws/forex,crypto=..."
+
+    # FMP request scheduler (size to the plan quota)
+    FMP_REQUESTS_PER_MINUTE: int = 300
+    FMP_BURST: int = 20
+    FMP_MAX_CONCURRENCY: int = 10
+    FMP_MAX_RETRIES: int = 4
+
+    # Pooled async HTTP client for FMP (HTTP/2 is used when `h2` is installed)
+    FMP_HTTP_MAX_CONNECTIONS: int = 20
+    FMP_HTTP_MAX_KEEPALIVE: int = 10
+    FMP_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    FMP_HTTP_TIMEOUT: float = 30.0
+    FMP_QUOTE_BATCH_SIZE: int = 200     # symbols per comma-separated quote request
+    FMP_QUOTE_CONCURRENCY: int = 4
+
+    # Filesystem stand-in for Azure Blob Storage (tests/offline runs); empty uses Azure
+    BLOB_LOCAL_DIR: str = ""
+
+    # Local data (CSV exports and the columnar bar store)
+    DATA_DIR: str = "data"
+    BAR_STORE_ENABLED: bool = True
+    RESPONSE_CACHE_ENABLED: bool = True     # disk cache for FMP reference endpoints
+    RESPONSE_CACHE_MAX_MB: int = 256
+
+    # Historical backfill into the bar store
+    BACKFILL_CONCURRENCY: int = 8
+    BACKFILL_CHECKPOINT_SECONDS: float = 5.0
+    BACKFILL_REPORT_SECONDS: float = 10.0
+
+    # Technicals ratings cache
+    RATINGS_CACHE_MAX_ENTRIES: int = 64
+    RATINGS_CACHE_TTL_FACTOR: float = 0.25      # TTL as a fraction of the bar interval
+    RATINGS_CACHE_STALE_FACTOR: float = 4.0     # stale entries are served up to TTL x factor
+    RATINGS_CACHE_STALE_WHILE_REVALIDATE: bool = True
+
+    # Background ratings snapshots
+    RATINGS_SCHEDULER_ENABLED: bool = True
+    RATINGS_SCHEDULER_TIMEFRAMES: str = "1hour,4hour,daily"
+    RATINGS_SCHEDULER_PERIOD: int = 14
+    RATINGS_SCHEDULER_STAGGER_SECONDS: float = 5.0
+    RATINGS_SCHEDULER_SETTLE_SECONDS: float = 5.0    # wait after a bar close before fetching
+    RATINGS_POOL_WORKERS: int = 0       # 0 uses every core
+    RATINGS_SHARD_SIZE: int = 1000      # symbols per process pool task
+
+    # Live indicators fed from the websocket tick stream
+    LIVE_INDICATOR_TIMEFRAMES: str = "1hour,4hour,daily"
+    LIVE_INDICATOR_PERIOD: int = 14
+    LIVE_INDICATOR_MAX_SERIES: int = 2000
+    LIVE_RATINGS_PUSH: bool = True      # allow clients to opt into rating events on /ws
+
+    # Upstream FMP websocket: batch subscription changes arriving within this window
+    FMP_WS_SUBSCRIBE_DEBOUNCE: float = 0.02
+
+    # Client websocket fan-out: per-connection outbound queue and send deadline
+    WS_CLIENT_QUEUE_SIZE: int = 1000    # queued messages before a slow client is disconnected
+    WS_SEND_TIMEOUT: float = 5.0        # seconds one send may take before the client is disconnected
+    WS_BATCH_MIN_MS: int = 10           # bounds for the batch_ms a client may ask for
+    WS_BATCH_MAX_MS: int = 5000
+    WS_BATCH_MAX_UPDATES: int = 5000    # a batch this large is sent before its interval ends
+
     @property
     def cors_origins(self) -> list:
         return self.ALLOWED_ORIGINS.split(",")
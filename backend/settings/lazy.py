@@ -0,0 +1,56 @@
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+
+_load_lock = threading.RLock()
+
+
+class _LazyModule(types.ModuleType):
+    """
+    Placeholder for a module that is imported on first attribute access.
+
+    The real import runs under a lock, so threads touching the module for
+    the first time at once wait for one complete import instead of seeing a
+    half-executed module (the failure mode of importlib's LazyLoader before
+    Python 3.12).
+    """
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def _load(self):
+        module = self.__dict__.get("_lazy_module")
+        if module is None:
+            with _load_lock:
+                module = self.__dict__.get("_lazy_module")
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    # later lookups hit the copied attributes without going through __getattr__
+                    self.__dict__.update(module.__dict__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+
+def lazy_import(name):
+    """
+    Returns `name` as a module that is only imported on first attribute access.
+
+    Keeps heavy dependencies (pandas, numpy, the Azure SDK, fmpsdk) off the
+    import path of main.py until a request or the warm-up actually uses them.
+    Only the top-level package is looked up now, so a dotted name does not
+    import its parents early.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    top_level = name.partition(".")[0]
+    if importlib.util.find_spec(top_level) is None:
+        raise ModuleNotFoundError(f"No module named '{top_level}'", name=top_level)
+    return _LazyModule(name)
+
+
+def preload(*names):
+    """Imports the named (possibly lazy) modules now; safe from any thread."""
+    for name in names:
+        importlib.import_module(name)
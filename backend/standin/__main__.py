@@ -0,0 +1,65 @@
+"""
+Local FMP stand-in for offline benchmarks and tests.
+
+Record real traffic (needs FMP_APIKEY and network):
+    python -m standin record-rest --port 8766       # then run the app with FMP_BASE_URL=http://127.0.0.1:8766/api
+    python -m standin record-ws forex --tickers eurusd,gbpusd --seconds 600
+
+Replay it, or generate synthetic ticks:
+    python -m standin serve --speed 10
+    python -m standin serve --synthetic-rate 5000
+
+and start the app with
+    FMP_BASE_URL=http://127.0.0.1:8765/api
+    FMP_WS_URLS=forex=ws://127.0.0.1:8765/ws/forex,crypto=ws://127.0.0.1:8765/ws/crypto,company=ws://127.0.0.1:8765/ws/company
+"""
+import argparse
+import asyncio
+import logging
+import os
+import uvicorn
+from settings.config import settings
+from .store import RecordingStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=os.path.join(settings.DATA_DIR, "standin"), help="recording directory")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="replay recordings / synthesize ticks")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    serve.add_argument("--synthetic-rate", type=float, default=0.0,
+                       help="synthetic messages per second per connection (ignores websocket recordings)")
+    serve.add_argument("--no-loop", action="store_true", help="stop after one pass over the recording")
+
+    record_rest = commands.add_parser("record-rest", help="recording proxy in front of FMP REST")
+    record_rest.add_argument("--host", default="127.0.0.1")
+    record_rest.add_argument("--port", type=int, default=8766)
+
+    record_ws = commands.add_parser("record-ws", help="record FMP websocket frames")
+    record_ws.add_argument("exchange", choices=["company", "crypto", "forex"])
+    record_ws.add_argument("--tickers", required=True, help="comma-separated tickers")
+    record_ws.add_argument("--seconds", type=float, default=300)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    store = RecordingStore(args.dir)
+
+    if args.command == "serve":
+        from .server import create_standin_app
+        app = create_standin_app(store, speed=args.speed, synthetic_rate=args.synthetic_rate, loop=not args.no_loop)
+        uvicorn.run(app, host=args.host, port=args.port)
+    elif args.command == "record-rest":
+        from .recorder import create_recording_proxy
+        uvicorn.run(create_recording_proxy(store), host=args.host, port=args.port)
+    else:
+        from .recorder import record_websocket
+        tickers = [t.strip().lower() for t in args.tickers.split(",") if t.strip()]
+        asyncio.run(record_websocket(store, args.exchange, tickers, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
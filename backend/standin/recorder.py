@@ -0,0 +1,76 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import httpx
+import websockets
+from fastapi import FastAPI, Request, Response
+from settings.config import settings
+from wsocket.listener import FMP_WS_URLS
+from .store import RecordingStore, rest_key
+
+logger = logging.getLogger(__name__)
+
+FMP_API_URL = "https://financialmodelingprep.com/api"
+
+
+def create_recording_proxy(store: RecordingStore, upstream=FMP_API_URL):
+    """
+    REST proxy that forwards /api/... to FMP and records every successful
+    answer. Point FMP_BASE_URL at it (http://host:port/api) while exercising
+    the app to capture a replayable data set.
+    """
+    app = FastAPI(title="FMP recording proxy")
+    client = httpx.AsyncClient(timeout=60)
+
+    @app.on_event("shutdown")
+    async def close_client():
+        await client.aclose()
+
+    @app.get("/api/{path:path}")
+    async def forward(path: str, request: Request):
+        params = dict(request.query_params)
+        params.setdefault("apikey", settings.FMP_APIKEY)
+        upstream_response = await client.get(f"{upstream.rstrip('/')}/{path}", params=params)
+        if upstream_response.status_code == 200:
+            content_type = upstream_response.headers.get("content-type", "application/json")
+            store.save_response(rest_key(path, params), 200, upstream_response.content, content_type)
+            logger.info(f"[Recorder] Recorded {path}")
+        return Response(
+            content=upstream_response.content,
+            status_code=upstream_response.status_code,
+            media_type=upstream_response.headers.get("content-type", "application/json"),
+        )
+
+    return app
+
+
+async def record_websocket(store: RecordingStore, exchange, tickers, seconds, url=None):
+    """
+    Subscribes to `tickers` on the real FMP websocket for `seconds` and appends
+    every frame, with its offset from the start, to the exchange's recording.
+    """
+    url = url or FMP_WS_URLS[exchange]
+    path = store.ws_path(exchange)
+    frames = 0
+    started = time.monotonic()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    async with websockets.connect(url) as ws:
+        await ws.send(json.dumps({"event": "login", "data": {"apiKey": settings.FMP_APIKEY}}))
+        logger.info(f"[Recorder] Login: {await ws.recv()}")
+        await ws.send(json.dumps({"event": "subscribe", "data": {"ticker": list(tickers)}}))
+
+        with open(path, "w") as f:
+            try:
+                while (remaining := seconds - (time.monotonic() - started)) > 0:
+                    try:
+                        message = await asyncio.wait_for(ws.recv(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    f.write(json.dumps({"t": round(time.monotonic() - started, 6), "msg": json.loads(message)}) + "\n")
+                    frames += 1
+            finally:
+                logger.info(f"[Recorder] {exchange}: {frames} frames in {time.monotonic() - started:.1f}s -> {path}")
+    return frames
@@ -0,0 +1,139 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response
+from .store import RecordingStore, rest_key
+
+logger = logging.getLogger(__name__)
+
+SYNTHETIC_START_PRICE = 100.0
+
+
+class StandinSession:
+    """State of one websocket client: login, subscriptions and counters."""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.tickers = set()
+        self.sent = 0
+
+    def wants(self, message):
+        symbol = str(message.get("s", "")).lower()
+        return symbol in self.tickers
+
+
+async def _read_commands(session: StandinSession):
+    """Applies login/subscribe/unsubscribe events as FMP does."""
+    while True:
+        event = json.loads(await session.websocket.receive_text())
+        tickers = event.get("data", {}).get("ticker", [])
+        tickers = [tickers] if isinstance(tickers, str) else tickers
+        if event.get("event") == "login":
+            await session.websocket.send_text(json.dumps({"event": "login", "status": 200, "message": "Authenticated"}))
+        elif event.get("event") == "subscribe":
+            session.tickers.update(t.lower() for t in tickers)
+        elif event.get("event") == "unsubscribe":
+            session.tickers.difference_update(t.lower() for t in tickers)
+
+
+async def replay_frames(session: StandinSession, frames, speed=1.0, loop=True):
+    """Sends recorded frames for subscribed tickers, keeping their spacing divided by `speed`."""
+    if not frames:
+        return
+    while True:
+        # a pass with nothing to wait for or send must still let the loop run
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        for offset, message in frames:
+            delay = offset / speed - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if session.wants(message):
+                await session.websocket.send_text(json.dumps(message))
+                session.sent += 1
+        if not loop:
+            return
+
+
+async def synthetic_ticks(session: StandinSession, rate, tick_interval=0.01):
+    """Random-walk quotes for subscribed tickers at `rate` messages per second overall."""
+    prices = {}
+    budget = 0.0
+    last = time.monotonic()
+    while True:
+        await asyncio.sleep(tick_interval)
+        now = time.monotonic()
+        budget += (now - last) * rate
+        last = now
+        tickers = list(session.tickers)
+        if not tickers:
+            budget = 0.0
+            continue
+        while budget >= 1:
+            budget -= 1
+            ticker = random.choice(tickers)
+            price = prices.get(ticker, SYNTHETIC_START_PRICE) * (1 + random.gauss(0, 0.0005))
+            prices[ticker] = price
+            spread = price * 0.0001
+            await session.websocket.send_text(json.dumps({
+                "s": ticker, "t": time.time_ns(), "type": "Q",
+                "ap": round(price + spread, 6), "as": random.randint(1, 100),
+                "bp": round(price - spread, 6), "bs": random.randint(1, 100),
+            }))
+            session.sent += 1
+
+
+def create_standin_app(store: RecordingStore, speed=1.0, synthetic_rate=0.0, loop=True):
+    """
+    Local FMP stand-in.
+
+    REST calls under /api/... are answered from the recording. Websocket
+    clients on /ws/{exchange} get the recorded frames replayed at `speed`x, or,
+    with `synthetic_rate` set (or no recording for the exchange), synthetic
+    quotes at that many messages per second.
+    """
+    app = FastAPI(title="FMP stand-in")
+    app.state.stats = {"rest_hits": 0, "rest_misses": 0, "ws_sessions": 0, "ws_sent": 0}
+
+    @app.get("/api/{path:path}")
+    async def rest(path: str, request: Request):
+        recorded = store.load_response(rest_key(path, dict(request.query_params)))
+        if recorded is None:
+            app.state.stats["rest_misses"] += 1
+            return JSONResponse({"Error Message": f"Not recorded: {path}"}, status_code=404)
+        app.state.stats["rest_hits"] += 1
+        status, content, content_type = recorded
+        return Response(content=content, status_code=status, media_type=content_type)
+
+    @app.get("/stats")
+    async def stats():
+        return app.state.stats
+
+    @app.websocket("/ws/{exchange}")
+    async def stream(websocket: WebSocket, exchange: str):
+        await websocket.accept()
+        session = StandinSession(websocket)
+        app.state.stats["ws_sessions"] += 1
+
+        frames = [] if synthetic_rate else store.load_frames(exchange)
+        if frames:
+            producer = replay_frames(session, frames, speed, loop)
+        else:
+            producer = synthetic_ticks(session, synthetic_rate or 10.0)
+
+        tasks = [asyncio.create_task(_read_commands(session)), asyncio.create_task(producer)]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            app.state.stats["ws_sent"] += session.sent
+            logger.info(f"[Standin] {exchange} session closed after {session.sent} messages")
+
+    return app
@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import threading
+from urllib.parse import urlencode
+
+
+def rest_key(path, params):
+    """Stable key for a REST call: API path plus sorted query, without the API key."""
+    query = sorted((k, str(v)) for k, v in params.items() if k != "apikey")
+    path = path.strip("/")
+    return f"{path}?{urlencode(query)}" if query else path
+
+
+class RecordingStore:
+    """
+    Recorded FMP traffic on disk.
+
+    REST responses are one JSON file per request under `rest/`, holding the
+    raw body and its content type so CSV endpoints replay as-is; websocket
+    frames are JSON lines under `ws/{exchange}.jsonl`, each with the seconds
+    elapsed since the recording started.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        self._rest = None
+
+    def _rest_path(self, key):
+        return os.path.join(self.root, "rest", hashlib.sha1(key.encode()).hexdigest() + ".json")
+
+    def ws_path(self, exchange):
+        return os.path.join(self.root, "ws", f"{exchange}.jsonl")
+
+    def save_response(self, key, status, content, content_type):
+        path = self._rest_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            # surrogateescape keeps non-UTF-8 bytes round-trippable
+            json.dump({
+                "key": key, "status": status, "content_type": content_type,
+                "content": content.decode("utf-8", "surrogateescape"),
+            }, f)
+        with self._lock:
+            if self._rest is not None:
+                self._rest[key] = (status, content, content_type)
+
+    @staticmethod
+    def _entry_response(entry):
+        if "content" in entry:
+            return entry["status"], entry["content"].encode("utf-8", "surrogateescape"), entry["content_type"]
+        # recordings made before content types were kept hold a parsed JSON body
+        return entry["status"], json.dumps(entry["body"]).encode(), "application/json"
+
+    def load_response(self, key):
+        """Returns (status, content, content_type) for a recorded request, or None."""
+        with self._lock:
+            if self._rest is None:
+                self._rest = {}
+                rest_dir = os.path.join(self.root, "rest")
+                for name in os.listdir(rest_dir) if os.path.isdir(rest_dir) else []:
+                    with open(os.path.join(rest_dir, name)) as f:
+                        entry = json.load(f)
+                    self._rest[entry["key"]] = self._entry_response(entry)
+            return self._rest.get(key)
+
+    def load_frames(self, exchange):
+        """Recorded websocket frames as (offset_seconds, message) pairs."""
+        path = self.ws_path(exchange)
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            return [(entry["t"], entry["msg"]) for entry in map(json.loads, f)]
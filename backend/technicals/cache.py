@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from settings.config import settings
+from .timeframes import timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class RatingCache:
+    """
+    Bounded LRU cache for ratings results with stale-while-revalidate.
+
+    Fresh entries are served directly. Entries past their TTL but still inside
+    the stale window are served immediately while a single background task
+    recomputes them. Concurrent misses for the same key share one computation.
+    """
+
+    def __init__(self, max_entries=64, ttl_factor=0.25, stale_factor=4.0, stale_while_revalidate=True):
+        self.max_entries = max_entries
+        self.ttl_factor = ttl_factor
+        self.stale_factor = stale_factor
+        self.stale_while_revalidate = stale_while_revalidate
+
+        self._entries = OrderedDict()   # key -> (value, fresh_until, stale_until)
+        self._inflight = {}             # key -> Task computing the value
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refresh_errors = 0
+
+    def ttl_for(self, time_series):
+        """TTL in seconds, tied to the bar interval of the time series."""
+        return max(30.0, timeframe_seconds(time_series) * self.ttl_factor)
+
+    async def get_or_compute(self, key, ttl, compute):
+        """
+        Returns the cached value for key, computing it with `compute()` when needed.
+
+        :param key: hashable cache key
+        :param ttl: seconds an entry stays fresh
+        :param compute: zero-argument coroutine function producing the value
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            if now < fresh_until:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if self.stale_while_revalidate and now < stale_until:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._refresh(key, ttl, compute)
+                return value
+
+        self.misses += 1
+        return await asyncio.shield(self._refresh(key, ttl, compute))
+
+    def get_or_start(self, key, ttl, compute):
+        """
+        Non-blocking get_or_compute for jobs too long for one request: returns
+        the cached value, or None after starting (or joining) its computation
+        in the background so the caller can poll.
+        """
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            if now < fresh_until:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+            if self.stale_while_revalidate and now < stale_until:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+                self._refresh(key, ttl, compute)
+                return value
+
+        if key not in self._inflight:
+            self.misses += 1
+        self._refresh(key, ttl, compute)
+        return None
+
+    def _refresh(self, key, ttl, compute):
+        """Starts (or joins) the one computation running for key."""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute_and_store(key, ttl, compute))
+            # Background refreshes have no awaiter; errors are already logged
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        return task
+
+    async def _compute_and_store(self, key, ttl, compute):
+        try:
+            value = await compute()
+            now = time.monotonic()
+            self._entries[key] = (value, now + ttl, now + ttl * self.stale_factor)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return value
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.error(f"[RatingCache] Failed to compute {key}: {e}")
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "refresh_errors": self.refresh_errors,
+            "refreshing": len(self._inflight),
+        }
+
+
+rating_cache = RatingCache(
+    max_entries=settings.RATINGS_CACHE_MAX_ENTRIES,
+    ttl_factor=settings.RATINGS_CACHE_TTL_FACTOR,
+    stale_factor=settings.RATINGS_CACHE_STALE_FACTOR,
+    stale_while_revalidate=settings.RATINGS_CACHE_STALE_WHILE_REVALIDATE,
+)
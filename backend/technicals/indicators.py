@@ -0,0 +1,165 @@
+"""
+Vectorized indicator engine.
+
+Every function works on stacked (symbols x bars) float64 arrays ordered oldest
+to newest. Symbols with shorter history are left-padded with NaN so the last
+column is always the most recent bar for every row.
+"""
+from settings.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+def stack_bars(series, max_bars=None):
+    """
+    Stack per-symbol (high, low, close) arrays into right-aligned 2D arrays.
+
+    :param series: list of (high, low, close) 1D arrays, oldest first
+    :param max_bars: keep at most this many trailing bars per symbol
+    :return: (high, low, close) arrays of shape (symbols, bars)
+    """
+    lengths = [len(close) for _, _, close in series]
+    width = max(lengths, default=0)
+    if max_bars is not None:
+        width = min(width, max_bars)
+
+    high = np.full((len(series), width), np.nan)
+    low = np.full((len(series), width), np.nan)
+    close = np.full((len(series), width), np.nan)
+
+    for row, bars in enumerate(series):
+        place_bars((high, low, close), row, bars)
+
+    return high, low, close
+
+
+def place_bars(out, row, bars):
+    """Writes one symbol's (high, low, close) into row `row` of `out`, right-aligned."""
+    width = out[0].shape[1]
+    h, l, c = bars
+    n = min(len(c), width)
+    if n == 0:
+        return
+    out[0][row, width - n:] = h[-n:]
+    out[1][row, width - n:] = l[-n:]
+    out[2][row, width - n:] = c[-n:]
+
+
+def wilder_smooth(values, period):
+    """
+    Wilder's moving average along the bar axis.
+
+    Each row is seeded with the simple mean of its first `period` valid values,
+    then smoothed as avg = (avg * (period - 1) + x) / period. Leading NaNs are
+    skipped per row, so differently sized histories can share one array.
+    """
+    rows, cols = values.shape
+    out = np.full(values.shape, np.nan)
+    total = np.zeros(rows)
+    count = np.zeros(rows, dtype=np.int64)
+    avg = np.full(rows, np.nan)
+
+    for t in range(cols):
+        x = values[:, t]
+        valid = ~np.isnan(x)
+        seeding = valid & (count < period)
+        rolling = valid & ~seeding
+
+        total[seeding] += x[seeding]
+        count[seeding] += 1
+        seeded = seeding & (count == period)
+        avg[seeded] = total[seeded] / period
+        avg[rolling] = (avg[rolling] * (period - 1) + x[rolling]) / period
+
+        out[:, t] = np.where(count >= period, avg, np.nan)
+
+    return out
+
+
+def _shift(values):
+    """Previous bar for every column; the first column becomes NaN."""
+    shifted = np.full(values.shape, np.nan)
+    shifted[:, 1:] = values[:, :-1]
+    return shifted
+
+
+def rsi(close, period=14):
+    """Relative Strength Index (Wilder)."""
+    delta = close - _shift(close)
+    gains = np.where(np.isnan(delta), np.nan, np.clip(delta, 0, None))
+    losses = np.where(np.isnan(delta), np.nan, np.clip(-delta, 0, None))
+
+    avg_gain = wilder_smooth(gains, period)
+    avg_loss = wilder_smooth(losses, period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        values = 100 - 100 / (1 + rs)
+    # No losses over the window means RSI is pinned at 100
+    return np.where((avg_loss == 0) & ~np.isnan(avg_gain), 100.0, values)
+
+
+def adx(high, low, close, period=14):
+    """Average Directional Index (Wilder)."""
+    prev_high = _shift(high)
+    prev_low = _shift(low)
+    prev_close = _shift(close)
+
+    up_move = high - prev_high
+    down_move = prev_low - low
+    missing = np.isnan(up_move) | np.isnan(down_move)
+
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    plus_dm[missing] = np.nan
+    minus_dm[missing] = np.nan
+
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    true_range[np.isnan(prev_close)] = np.nan
+
+    smooth_tr = wilder_smooth(true_range, period)
+    smooth_plus = wilder_smooth(plus_dm, period)
+    smooth_minus = wilder_smooth(minus_dm, period)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100 * smooth_plus / smooth_tr
+        minus_di = 100 * smooth_minus / smooth_tr
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum == 0, 0.0, 100 * np.abs(plus_di - minus_di) / di_sum)
+    dx[np.isnan(di_sum)] = np.nan
+
+    return wilder_smooth(dx, period)
+
+
+def williams_r(high, low, close, period=14):
+    """Williams %R over a rolling high/low window."""
+    out = np.full(close.shape, np.nan)
+    if close.shape[1] < period:
+        return out
+
+    # np.max/np.min propagate NaN, so windows reaching into padding stay NaN
+    highest = np.lib.stride_tricks.sliding_window_view(high, period, axis=1).max(axis=-1)
+    lowest = np.lib.stride_tricks.sliding_window_view(low, period, axis=1).min(axis=-1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = (highest - close[:, period - 1:]) / (highest - lowest) * -100
+    out[:, period - 1:] = np.where(highest == lowest, -50.0, values)
+    out[:, period - 1:][np.isnan(highest - lowest)] = np.nan
+    return out
+
+
+def compute_latest(high, low, close, period=14):
+    """
+    Computes RSI, ADX and Williams %R for every row in one pass.
+
+    :return: dict of indicator name -> 1D array with the latest value per row
+    """
+    if close.shape[1] == 0:
+        empty = np.full(close.shape[0], np.nan)
+        return {'rsi': empty, 'adx': empty.copy(), 'williams': empty.copy()}
+
+    return {
+        'rsi': rsi(close, period)[:, -1],
+        'adx': adx(high, low, close, period)[:, -1],
+        'williams': williams_r(high, low, close, period)[:, -1],
+    }
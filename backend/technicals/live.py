@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import math
+from collections import deque
+from settings.config import settings
+from .ratings import score_indicators, fetch_price_bars, frame_to_timed_bars
+from .timeframes import timeframe_seconds, exchange_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class WilderAverage:
+    """
+    Streaming Wilder moving average, seeded with the mean of the first `period` values.
+    Matches indicators.wilder_smooth value for value.
+    """
+    __slots__ = ("period", "total", "count", "value")
+
+    def __init__(self, period):
+        self.period = period
+        self.total = 0.0
+        self.count = 0
+        self.value = None
+
+    def peek(self, x):
+        """Value after `x` without committing it."""
+        if self.count >= self.period:
+            return (self.value * (self.period - 1) + x) / self.period
+        if self.count + 1 == self.period:
+            return (self.total + x) / self.period
+        return None
+
+    def update(self, x):
+        self.value = self.peek(x)
+        if self.count < self.period:
+            self.total += x
+            self.count += 1
+        return self.value
+
+
+class IncrementalIndicators:
+    """
+    RSI, ADX and Williams %R updated in O(1) per closed bar.
+
+    `update` commits a closed bar; `peek` returns the values as if the forming
+    bar closed now, without changing state.
+    """
+
+    def __init__(self, period=14):
+        self.period = period
+        self.prev = None    # (high, low, close) of the last committed bar
+        self.avg_gain = WilderAverage(period)
+        self.avg_loss = WilderAverage(period)
+        self.tr = WilderAverage(period)
+        self.plus_dm = WilderAverage(period)
+        self.minus_dm = WilderAverage(period)
+        self.adx = WilderAverage(period)
+        self.highs = deque(maxlen=period)
+        self.lows = deque(maxlen=period)
+
+    def _step(self, high, low, close, commit):
+        op = "update" if commit else "peek"
+        values = {"rsi": None, "adx": None, "williams": None}
+
+        if self.prev is not None:
+            prev_high, prev_low, prev_close = self.prev
+
+            delta = close - prev_close
+            gain = getattr(self.avg_gain, op)(max(delta, 0.0))
+            loss = getattr(self.avg_loss, op)(max(-delta, 0.0))
+            if gain is not None and loss is not None:
+                values["rsi"] = 100.0 if loss == 0 else 100 - 100 / (1 + gain / loss)
+
+            up_move = high - prev_high
+            down_move = prev_low - low
+            plus = up_move if up_move > down_move and up_move > 0 else 0.0
+            minus = down_move if down_move > up_move and down_move > 0 else 0.0
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+            tr = getattr(self.tr, op)(true_range)
+            plus_avg = getattr(self.plus_dm, op)(plus)
+            minus_avg = getattr(self.minus_dm, op)(minus)
+            if tr is not None:
+                # A flat stretch has no directional movement; dx 0 keeps ADX decaying
+                plus_di = 100 * plus_avg / tr if tr else 0.0
+                minus_di = 100 * minus_avg / tr if tr else 0.0
+                di_sum = plus_di + minus_di
+                dx = 0.0 if di_sum == 0 else 100 * abs(plus_di - minus_di) / di_sum
+                values["adx"] = getattr(self.adx, op)(dx)
+
+        highs, lows = list(self.highs), list(self.lows)
+        if len(highs) == self.period:
+            highs, lows = highs[1:], lows[1:]
+        highs.append(high)
+        lows.append(low)
+        if len(highs) == self.period:
+            highest, lowest = max(highs), min(lows)
+            values["williams"] = -50.0 if highest == lowest else (highest - close) / (highest - lowest) * -100
+
+        if commit:
+            self.prev = (high, low, close)
+            self.highs.append(high)
+            self.lows.append(low)
+        return values
+
+    def update(self, high, low, close):
+        return self._step(high, low, close, commit=True)
+
+    def peek(self, high, low, close):
+        return self._step(high, low, close, commit=False)
+
+
+class LiveSeries:
+    """Forming bar plus indicator state for one (symbol, timeframe)."""
+
+    def __init__(self, symbol, time_series, period):
+        self.symbol = symbol
+        self.time_series = time_series
+        self.seconds = timeframe_seconds(time_series)
+        self.indicators = IncrementalIndicators(period)
+        self.bucket = None
+        self.bar = None     # [high, low, close] of the forming bar
+        self.rating = None
+        self.values = None
+
+    def seed(self, timestamps, high, low, close):
+        """
+        Replays history; the newest bar becomes the forming bar of its bucket,
+        so ticks in a later bucket commit it first.
+        """
+        for h, l, c in zip(high[:-1], low[:-1], close[:-1]):
+            self.indicators.update(h, l, c)
+        if len(close):
+            self.bucket = int(timestamps[-1] // self.seconds)
+            self.bar = [high[-1], low[-1], close[-1]]
+            self._evaluate()
+
+    def on_price(self, price, ts):
+        """Applies a tick at `ts`, in exchange_timestamp() seconds like the seeded bars."""
+        bucket = int(ts // self.seconds)
+        if self.bucket is None:
+            self.bucket = bucket
+        elif bucket < self.bucket:
+            return False
+        elif bucket > self.bucket:
+            if self.bar is not None:
+                self.indicators.update(*self.bar)
+            self.bar = None
+            self.bucket = bucket
+
+        if self.bar is None:
+            self.bar = [price, price, price]
+        else:
+            self.bar[0] = max(self.bar[0], price)
+            self.bar[1] = min(self.bar[1], price)
+            self.bar[2] = price
+        return self._evaluate()
+
+    def _evaluate(self):
+        """Recomputes the provisional rating; returns True when it changed."""
+        self.values = self.indicators.peek(*self.bar)
+        rating = score_indicators(self.values["rsi"], self.values["adx"], self.values["williams"])
+        changed = self.rating is not None and rating != self.rating
+        self.rating = rating
+        return changed
+
+
+class LiveIndicatorRegistry:
+    """
+    Live ratings per (symbol, timeframe), seeded once over REST and then fed
+    from the FMPListener tick stream.
+    """
+
+    def __init__(self, timeframes, period=14, max_series=2000):
+        self.timeframes = list(timeframes)
+        self.period = period
+        self.max_series = max_series
+        self.series = {}        # (SYMBOL, timeframe) -> LiveSeries
+        self.by_symbol = {}     # SYMBOL -> [LiveSeries]
+        self._seeding = set()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """Registers `async callback(exchange, symbol, time_series, rating)` for rating changes."""
+        self._listeners.append(callback)
+
+    async def track(self, symbols, timeframes=None):
+        """Seeds live state for every symbol x timeframe not tracked yet."""
+        timeframes = timeframes or self.timeframes
+        for time_series in timeframes:
+            wanted = [
+                s.upper() for s in symbols
+                if (s.upper(), time_series) not in self.series and (s.upper(), time_series) not in self._seeding
+            ]
+            wanted = wanted[:max(self.max_series - len(self.series) - len(self._seeding), 0)]
+            if not wanted:
+                continue
+
+            self._seeding.update((s, time_series) for s in wanted)
+            try:
+                frames = await fetch_price_bars(wanted, time_series)
+                for symbol in wanted:
+                    # untracked while its history was loading
+                    if (symbol, time_series) not in self._seeding or (symbol, time_series) in self.series:
+                        continue
+                    live = LiveSeries(symbol, time_series, self.period)
+                    live.seed(*frame_to_timed_bars(frames.get(symbol)))
+                    self.series[(symbol, time_series)] = live
+                    self.by_symbol.setdefault(symbol, []).append(live)
+            except Exception as e:
+                logger.error(f"[LiveIndicators] Failed to seed {wanted} {time_series}: {e}")
+            finally:
+                self._seeding.difference_update((s, time_series) for s in wanted)
+
+    def untrack(self, symbols):
+        """Drops every timeframe of `symbols`, e.g. once no client subscribes to them."""
+        for symbol in symbols:
+            symbol = symbol.upper()
+            for live in self.by_symbol.pop(symbol, []):
+                self.series.pop((symbol, live.time_series), None)
+            self._seeding.difference_update((symbol, time_series) for time_series in self.timeframes)
+
+    def on_tick(self, tick):
+        """Updates every tracked timeframe of the tick's symbol; O(1) per series."""
+        ticker = tick.get("ticker")
+        series = self.by_symbol.get(ticker.upper()) if ticker else None
+        if not series:
+            return
+
+        price = tick.get("last_price")
+        if price is None and tick.get("bid_price") is not None and tick.get("ask_price") is not None:
+            price = (tick["bid_price"] + tick["ask_price"]) / 2
+        if price is None or (isinstance(price, float) and math.isnan(price)):
+            return
+
+        now = exchange_timestamp()
+        for live in series:
+            if live.on_price(float(price), now):
+                for callback in self._listeners:
+                    asyncio.create_task(callback(tick.get("exchange"), ticker, live.time_series, live.rating))
+
+    def rating(self, symbol, time_series, period):
+        """Current rating for a tracked symbol, or None."""
+        if period != self.period:
+            return None
+        live = self.series.get((symbol.upper(), time_series))
+        return live.rating if live is not None else None
+
+    def overlay(self, ratings, time_series, period):
+        """Returns `ratings` with tracked symbols replaced by their live rating."""
+        if period != self.period or not self.series:
+            return ratings
+        merged = dict(ratings)
+        for symbol in ratings:
+            live = self.rating(symbol, time_series, period)
+            if live is not None:
+                merged[symbol] = live
+        return merged
+
+    def snapshot(self, symbol):
+        """Live indicator values and ratings for every timeframe of a symbol."""
+        return {
+            live.time_series: {**(live.values or {}), **(live.rating or {})}
+            for live in self.by_symbol.get(symbol.upper(), [])
+        }
+
+
+live_indicators = LiveIndicatorRegistry(
+    timeframes=[ts.strip() for ts in settings.LIVE_INDICATOR_TIMEFRAMES.split(",") if ts.strip()],
+    period=settings.LIVE_INDICATOR_PERIOD,
+    max_series=settings.LIVE_INDICATOR_MAX_SERIES,
+)
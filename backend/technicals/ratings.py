@@ -1,15 +1,36 @@
 import asyncio
 import logging
-import pandas as pd
-from fmp.connect import fmp_bridge
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from fmp.aioconnect import afmp_bridge
+from fmp.singleflight import fmp_single_flight
+from .indicators import stack_bars, place_bars, compute_latest
+from .sharding import SharedBars, compute_latest_sharded
+from .resample import resample_bars
+from .timeframes import lookback_days, timeframe_seconds
+from settings.lazy import lazy_import
 
-# Dynamically size semaphore to no more than symbol‐count
-def make_semaphore(symbols, max_size=4):
-    size = min(len(symbols), max_size)
-    return asyncio.Semaphore(size)
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
 
 logger = logging.getLogger(__name__)
 
+# Symbol lists behind each ratings universe
+UNIVERSES = {
+    'commodities': afmp_bridge.get_commodities_list,
+    'forex': afmp_bridge.get_forex_list,
+}
+
+# Every exchange the generic ratings endpoint can shard over
+EXCHANGES = {
+    **UNIVERSES,
+    'crypto': afmp_bridge.get_cryptocurrencies_list,
+    'stocks': afmp_bridge.get_stocks_list,
+}
+
+HISTORY_BARS = 250      # bars kept per symbol for the local engine
+DAILY_BATCH_SIZE = 5    # symbols per historical-price-full request
+
 def classify_score(score):
     score_mapping = {
         3: 'Strong Buy',  2: 'Buy',  1: 'Weak Buy',
@@ -17,55 +38,288 @@ def classify_score(score):
     }
     return score_mapping.get(score, 'Strong Sell')
 
+def score_indicators(rsi_val, adx_val, willr_val):
+    """
+    Scores the latest RSI, ADX and Williams %R values; missing values count as neutral.
+    """
+    rsi_val, adx_val, willr_val = (
+        None if v is None or pd.isna(v) else v for v in (rsi_val, adx_val, willr_val)
+    )
+
+    rsi_score   = 1 if rsi_val  is not None and rsi_val  < 30 else (-1 if rsi_val  is not None and rsi_val  > 70 else 0)
+    adx_score   = 1 if adx_val  is not None and adx_val  >= 25 else (-1 if adx_val  is not None and adx_val  < 20 else 0)
+    willr_score= 1 if willr_val is not None and willr_val < -80 else (-1 if willr_val is not None and willr_val > -20 else 0)
+
+    total_score = rsi_score + adx_score + willr_score
+    return {
+        "score": total_score,
+        "rating": classify_score(total_score)
+    }
+
+def symbols_from_frame(df):
+    """
+    Extracts symbols from a list frame, including the single-row frame get_stocks_list returns.
+    """
+    if 'symbol' in df.columns:
+        return [sym for sym in df['symbol'].tolist() if sym]
+    symbols = []
+    for cell in df.iloc[0]:
+        sym = cell.get('symbol') if isinstance(cell, dict) else cell
+        if sym:
+            symbols.append(sym)
+    return symbols
+
+async def get_universe_symbols(universe):
+    """
+    Returns the symbols of a ratings universe or exchange.
+    """
+    data = await fmp_single_flight.do_async(('universe', universe), EXCHANGES[universe])
+    if data.empty:
+        raise HTTPException(status_code=404, detail="Data not found.")
+    return symbols_from_frame(data)
+
 async def fetch_indicator_data(symbol, period, time_series, indicator_type):
     """
-    Fetch indicator data via asyncio.to_thread.
+    Fetch indicator data through the async FMP client.
     """
     try:
-        df = await asyncio.to_thread(
-            fmp_bridge.get_technical_indicators,
-            symbol, period, indicator_type, time_series
-        )
+        df = await afmp_bridge.get_technical_indicators(symbol, period, indicator_type, time_series)
         return pd.DataFrame(df)
     except Exception as e:
         logger.error(f"[Error] {symbol} - {indicator_type}: {e}")
         return pd.DataFrame()
 
-async def fetch_indicators(symbol, period, time_series, semaphore):
+async def fetch_indicators(symbol, period, time_series):
     """
-    Fetch RSI, ADX, Williams %R concurrently under one semaphore.
+    Fetch RSI, ADX, Williams %R concurrently; the FMP scheduler bounds concurrency.
     """
-    async with semaphore:
-        # fire all three fetches at once :contentReference[oaicite:6]{index=6}
-        rsi_df, adx_df, willr_df = await asyncio.gather(
-            fetch_indicator_data(symbol, period, time_series, 'rsi'),
-            fetch_indicator_data(symbol, period, time_series, 'adx'),
-            fetch_indicator_data(symbol, period, time_series, 'williams'),
-        )
+    # fire all three fetches at once :contentReference[oaicite:6]{index=6}
+    rsi_df, adx_df, willr_df = await asyncio.gather(
+        fetch_indicator_data(symbol, period, time_series, 'rsi'),
+        fetch_indicator_data(symbol, period, time_series, 'adx'),
+        fetch_indicator_data(symbol, period, time_series, 'williams'),
+    )
 
-        # fast scalar extraction :contentReference[oaicite:7]{index=7}
-        rsi_val  = rsi_df['rsi'].iat[-1]     if not rsi_df.empty else None
-        adx_val  = adx_df['adx'].iat[-1]     if not adx_df.empty else None
-        willr_val= willr_df['williams'].iat[-1] if not willr_df.empty else None
+    # fast scalar extraction :contentReference[oaicite:7]{index=7}
+    rsi_val  = rsi_df['rsi'].iat[-1]     if not rsi_df.empty else None
+    adx_val  = adx_df['adx'].iat[-1]     if not adx_df.empty else None
+    willr_val= willr_df['williams'].iat[-1] if not willr_df.empty else None
 
-        rsi_score   = 1 if rsi_val  is not None and rsi_val  < 30 else (-1 if rsi_val  is not None and rsi_val  > 70 else 0)
-        adx_score   = 1 if adx_val  is not None and adx_val  >= 25 else (-1 if adx_val  is not None and adx_val  < 20 else 0)
-        willr_score= 1 if willr_val is not None and willr_val < -80 else (-1 if willr_val is not None and willr_val > -20 else 0)
+    return symbol, score_indicators(rsi_val, adx_val, willr_val)
 
-        total_score = rsi_score + adx_score + willr_score
-        return symbol, {
-            "score": total_score,
-            "rating": classify_score(total_score)
-        }
+def frame_to_bars(df):
+    """
+    Returns (high, low, close) float arrays ordered oldest to newest.
+    """
+    if df is None or df.empty:
+        empty = np.empty(0)
+        return empty, empty, empty
+    df = df.sort_values('date')
+    return (
+        df['high'].to_numpy(dtype=np.float64),
+        df['low'].to_numpy(dtype=np.float64),
+        df['close'].to_numpy(dtype=np.float64),
+    )
 
-async def tickers_indicator_rating(symbols, period, time_series):
+async def fetch_daily_bars(symbols, from_date, to_date):
+    """
+    Fetch daily bars for a batch of symbols in one request.
     """
-    Calculate ratings for symbols, using optimized fetch.
+    df = await afmp_bridge.get_historical_daily_bars(symbols, from_date, to_date)
+    if df.empty:
+        return {}
+    return {symbol: group for symbol, group in df.groupby('symbol')}
+
+async def fetch_intraday_bars(symbol, time_series, days):
+    """
+    Fetch intraday bars for one symbol.
+    """
+    df = await afmp_bridge.get_historical_period_data(symbol, None, time_series, days)
+    return {symbol: df}
+
+async def fetch_price_bars(symbols, time_series, bars=HISTORY_BARS):
+    """
+    Fetch OHLC history for every symbol, batching daily requests.
+
+    :return: dict of symbol -> DataFrame of bars
+    """
+    days = lookback_days(time_series, bars)
+
+    if time_series == 'daily':
+        to_date = datetime.now().strftime('%Y-%m-%d')
+        from_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        tasks = [
+            fetch_daily_bars(symbols[i:i + DAILY_BATCH_SIZE], from_date, to_date)
+            for i in range(0, len(symbols), DAILY_BATCH_SIZE)
+        ]
+    else:
+        tasks = [fetch_intraday_bars(sym, time_series, days) for sym in symbols]
+
+    frames = {}
+    for result in await asyncio.gather(*tasks):
+        frames.update(result)
+    return frames
+
+def frame_to_timed_bars(df):
+    """
+    Returns (timestamps, high, low, close) ordered oldest to newest, timestamps in epoch seconds.
+    """
+    if df is None or df.empty:
+        return (np.empty(0, dtype=np.int64),) + frame_to_bars(None)
+    df = df.sort_values('date')
+    timestamps = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[s]').astype(np.int64)
+    return (timestamps,) + frame_to_bars(df)
+
+def rate_series(symbols, series, period):
+    """
+    Scores every symbol from (high, low, close) arrays in one vectorized pass.
+    """
+    high, low, close = stack_bars(series, HISTORY_BARS)
+    latest = compute_latest(high, low, close, period)
+    return {
+        sym: score_indicators(latest['rsi'][row], latest['adx'][row], latest['williams'][row])
+        for row, sym in enumerate(symbols)
+    }
+
+def fill_shared_bars(bars, symbols, frames):
     """
-    semaphore = make_semaphore(symbols, max_size=10)
-    tasks = [
-        fetch_indicators(sym, period, time_series, semaphore)
-        for sym in symbols
-    ]
-    results = await asyncio.gather(*tasks)  # overall concurrency control
-    return dict(results)
+    Places every symbol's bars in its SharedBars row, releasing each frame
+    as soon as its row is written.
+    """
+    for row, sym in enumerate(symbols):
+        place_bars(bars.array, row, frame_to_bars(frames.pop(sym, None)))
+
+async def sharded_indicator_rating(symbols, period, time_series):
+    """
+    Rates a large universe, spreading the indicator math over the process pool.
+    """
+    frames = await fetch_price_bars(symbols, time_series)
+    with SharedBars(len(symbols), HISTORY_BARS) as bars:
+        await asyncio.to_thread(fill_shared_bars, bars, symbols, frames)
+        del frames
+        latest = await compute_latest_sharded(bars, period)
+    return {
+        sym: score_indicators(latest['rsi'][row], latest['adx'][row], latest['williams'][row])
+        for row, sym in enumerate(symbols)
+    }
+
+def rate_bars(symbols, frames, period):
+    """
+    Scores every symbol from its bar DataFrames.
+    """
+    return rate_series(symbols, [frame_to_bars(frames.get(sym)) for sym in symbols], period)
+
+def rate_timeframes(symbols, frames, period, timeframes):
+    """
+    Resamples each symbol's finest bars into every timeframe and scores them.
+
+    :return: dict of symbol -> {timeframe: rating}
+    """
+    timed = [frame_to_timed_bars(frames.get(sym)) for sym in symbols]
+    results = {sym: {} for sym in symbols}
+    for time_series in timeframes:
+        seconds = timeframe_seconds(time_series)
+        series = [resample_bars(ts, h, l, c, seconds)[1:] for ts, h, l, c in timed]
+        for sym, rating in rate_series(symbols, series, period).items():
+            results[sym][time_series] = rating
+    return results
+
+async def multi_timeframe_rating(symbols, period, timeframes):
+    """
+    Rates symbols on several timeframes from a single fetch of the finest series.
+    """
+    timeframes = sorted(set(timeframes), key=timeframe_seconds)
+    finest, coarsest = timeframes[0], timeframes[-1]
+    bars = HISTORY_BARS * timeframe_seconds(coarsest) // timeframe_seconds(finest)
+
+    frames = await fetch_price_bars(symbols, finest, bars)
+    return await asyncio.to_thread(rate_timeframes, symbols, frames, period, timeframes)
+
+async def tickers_indicator_rating(symbols, period, time_series, engine="local"):
+    """
+    Calculate ratings for symbols.
+
+    The local engine fetches price bars once and computes every indicator
+    in-process; engine="fmp" falls back to FMP's technical_indicator API.
+    """
+    if engine == "fmp":
+        tasks = [
+            fetch_indicators(sym, period, time_series)
+            for sym in symbols
+        ]
+        results = await asyncio.gather(*tasks)  # bounded by fmp_scheduler and the HTTP pool
+        return dict(results)
+
+    # Symbols tracked from the tick stream are already current
+    from .live import live_indicators
+    live = {sym: live_indicators.rating(sym, time_series, period) for sym in symbols}
+    live = {sym: rating for sym, rating in live.items() if rating is not None}
+    remaining = [sym for sym in symbols if sym not in live]
+
+    frames = await fetch_price_bars(remaining, time_series)
+    ratings = await asyncio.to_thread(rate_bars, remaining, frames, period)
+    return {sym: live.get(sym) or ratings[sym] for sym in symbols}
+
+async def _stream_batch(batch, period, time_series, engine):
+    """
+    Rates one batch of symbols for the streaming path.
+    """
+    if engine == "fmp":
+        symbol, rating = await fetch_indicators(batch[0], period, time_series)
+        return {symbol: rating}
+
+    days = lookback_days(time_series, HISTORY_BARS)
+    if time_series == 'daily':
+        to_date = datetime.now().strftime('%Y-%m-%d')
+        from_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        frames = await fetch_daily_bars(batch, from_date, to_date)
+    else:
+        frames = await fetch_intraday_bars(batch[0], time_series, days)
+    return rate_bars(batch, frames, period)
+
+async def stream_indicator_rating(symbols, period, time_series, engine="local", concurrency=10):
+    """
+    Yields (symbol, rating) pairs as soon as each batch is rated.
+
+    A fixed pool of workers pulls batches and hands results over a bounded
+    queue, so memory stays flat however large the universe or slow the reader.
+    """
+    batch_size = DAILY_BATCH_SIZE if engine == "local" and time_series == 'daily' else 1
+    batches = [symbols[i:i + batch_size] for i in range(0, len(symbols), batch_size)]
+    if not batches:
+        return
+
+    pending = asyncio.Queue()
+    for batch in batches:
+        pending.put_nowait(batch)
+    results = asyncio.Queue(maxsize=concurrency * batch_size)
+    done = object()
+
+    async def worker():
+        while True:
+            try:
+                batch = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            try:
+                ratings = await _stream_batch(batch, period, time_series, engine)
+            except Exception as e:
+                logger.error(f"[Stream] {batch}: {e}")
+                ratings = {sym: score_indicators(None, None, None) for sym in batch}
+            for item in ratings.items():
+                await results.put(item)
+        await results.put(done)
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(batches)))]
+    try:
+        finished = 0
+        while finished < len(workers):
+            item = await results.get()
+            if item is done:
+                finished += 1
+                continue
+            yield item
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
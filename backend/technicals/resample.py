@@ -0,0 +1,25 @@
+from settings.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+
+def resample_bars(timestamps, high, low, close, seconds):
+    """
+    Aggregates bars into coarser buckets of `seconds`, aligned to the epoch.
+
+    :param timestamps: int64 epoch seconds, ascending
+    :return: (timestamps, high, low, close) of the coarser bars
+    """
+    if len(timestamps) == 0:
+        return timestamps, high, low, close
+
+    buckets = timestamps // seconds
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(close)] - 1
+
+    return (
+        buckets[starts] * seconds,
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        close[ends],
+    )
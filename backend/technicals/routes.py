@@ -1,36 +1,186 @@
-from fastapi import APIRouter, Query
-from fmp.connect import fmp_bridge
-from .ratings import tickers_indicator_rating
+import json
+from typing import List
+from fastapi import APIRouter, Query, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from .ratings import UNIVERSES, EXCHANGES, sharded_indicator_rating, tickers_indicator_rating, get_universe_symbols, stream_indicator_rating, multi_timeframe_rating
+from .cache import rating_cache
+from .scheduler import ratings_scheduler
+from .live import live_indicators
 from fastapi import BackgroundTasks
 
 technicals_router = APIRouter()
 
+async def cached_universe_rating(universe, period, time_series, engine, response=None):
+    """
+    Rates a whole universe, served from the latest precomputed snapshot or
+    the ratings cache when possible.
+    """
+    if engine == "local":
+        snapshot = ratings_scheduler.latest(universe, period, time_series)
+        if snapshot is not None:
+            if response is not None:
+                response.headers["X-Ratings-Version"] = str(snapshot["version"])
+                response.headers["X-Ratings-Computed-At"] = str(snapshot["computed_at"])
+            return live_indicators.overlay(snapshot["data"], time_series, period)
+
+    async def compute():
+        symbols = await get_universe_symbols(universe)
+        return await tickers_indicator_rating(symbols, period, time_series, engine)
+
+    try:
+        ttl = rating_cache.ttl_for(time_series)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    key = (universe, period, time_series, engine)
+    ratings = await rating_cache.get_or_compute(key, ttl, compute)
+    return live_indicators.overlay(ratings, time_series, period) if engine == "local" else ratings
+
 @technicals_router.post("/get_commodities_technical_rates")
 async def get_commodities_technical_rates(
+    response: Response,
     RSI_PERIOD: int = Query(14, description="Relative Strength Index period"),
-    TIMESERIES: str = Query('daily', description="Time series interval")
+    TIMESERIES: str = Query('daily', description="Time series interval"),
+    ENGINE: str = Query('local', description="'local' computes indicators in-process, 'fmp' uses FMP's indicator API")
 ):
-    data = fmp_bridge.get_commodities_list()
-    commodities_list = fmp_bridge.handle_data_frame(data)
-
-    symbols = [item['symbol'] for item in commodities_list]
-
-    # Immediately calculate and return the results
-    commodities_ratings = await tickers_indicator_rating(symbols, RSI_PERIOD, TIMESERIES)
+    commodities_ratings = await cached_universe_rating('commodities', RSI_PERIOD, TIMESERIES, ENGINE, response)
 
     return commodities_ratings
 
 @technicals_router.post("/get_forex_technical_rates")
 async def get_forex_technical_rates(
+    response: Response,
+    RSI_PERIOD: int = Query(14, description="Relative Strength Index period"),
+    TIMESERIES: str = Query('daily', description="Time series interval"),
+    ENGINE: str = Query('local', description="'local' computes indicators in-process, 'fmp' uses FMP's indicator API")
+):
+    forex_ratings = await cached_universe_rating('forex', RSI_PERIOD, TIMESERIES, ENGINE, response)
+
+    return forex_ratings
+
+@technicals_router.post("/multi_timeframe_rates/{universe}")
+async def get_multi_timeframe_rates(
+    universe: str,
+    RSI_PERIOD: int = Query(14, description="Relative Strength Index period"),
+    TIMEFRAMES: List[str] = Query(['1hour', '4hour', 'daily'], description="Timeframes to rate")
+):
+    """Ratings for every timeframe, resampled in-process from one fetch of the finest series."""
+    if universe not in UNIVERSES:
+        raise HTTPException(status_code=404, detail=f"Unknown universe. Valid options: {list(UNIVERSES)}")
+    if not TIMEFRAMES:
+        raise HTTPException(status_code=400, detail="TIMEFRAMES must list at least one timeframe.")
+    try:
+        ttl = min(rating_cache.ttl_for(ts) for ts in TIMEFRAMES)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def compute():
+        symbols = await get_universe_symbols(universe)
+        return await multi_timeframe_rating(symbols, RSI_PERIOD, TIMEFRAMES)
+
+    key = (universe, RSI_PERIOD, tuple(sorted(set(TIMEFRAMES))), "multi_timeframe")
+    return await rating_cache.get_or_compute(key, ttl, compute)
+
+@technicals_router.get("/stream/{universe}")
+async def stream_technical_rates(
+    universe: str,
     RSI_PERIOD: int = Query(14, description="Relative Strength Index period"),
-    TIMESERIES: str = Query('daily', description="Time series interval")
+    TIMESERIES: str = Query('daily', description="Time series interval"),
+    ENGINE: str = Query('local', description="'local' computes indicators in-process, 'fmp' uses FMP's indicator API"),
+    FORMAT: str = Query('ndjson', description="'ndjson' or 'sse'")
 ):
-    data = fmp_bridge.get_forex_list()
-    forex_list = fmp_bridge.handle_data_frame(data)
+    """Streams each symbol's rating as soon as it is computed."""
+    if universe not in UNIVERSES:
+        raise HTTPException(status_code=404, detail=f"Unknown universe. Valid options: {list(UNIVERSES)}")
+    if FORMAT not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="Invalid format. Valid options: ['ndjson', 'sse']")
+    try:
+        rating_cache.ttl_for(TIMESERIES)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    symbols = await get_universe_symbols(universe)
+    snapshot = ratings_scheduler.latest(universe, RSI_PERIOD, TIMESERIES) if ENGINE == "local" else None
+
+    async def ratings():
+        if snapshot is not None:
+            for item in snapshot["data"].items():
+                yield item
+        else:
+            async for item in stream_indicator_rating(symbols, RSI_PERIOD, TIMESERIES, ENGINE):
+                yield item
+
+    async def body():
+        async for symbol, rating in ratings():
+            line = json.dumps({"symbol": symbol, **rating})
+            yield f"data: {line}\n\n" if FORMAT == "sse" else f"{line}\n"
+        if FORMAT == "sse":
+            yield "event: end\ndata: {}\n\n"
+
+    media_type = "text/event-stream" if FORMAT == "sse" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
+
+@technicals_router.get("/live/{symbol}")
+async def get_live_rating(symbol: str):
+    """Live indicator values and ratings for a symbol tracked from the tick stream."""
+    live = live_indicators.snapshot(symbol)
+    if not live:
+        raise HTTPException(status_code=404, detail=f"{symbol} is not tracked live.")
+    return live
+
+@technicals_router.get("/cache-stats")
+async def get_cache_stats():
+    """Hit/miss counters for the ratings cache."""
+    return rating_cache.stats()
+
+@technicals_router.get("/snapshots")
+async def get_snapshots():
+    """Version and age of every precomputed ratings snapshot."""
+    return ratings_scheduler.describe()
+
+# Keep last: the path parameter would shadow fixed POST routes declared after it
+@technicals_router.post("/{exchange}")
+async def get_exchange_technical_rates(
+    exchange: str,
+    response: Response,
+    RSI_PERIOD: int = Query(14, description="Relative Strength Index period"),
+    TIMESERIES: str = Query('daily', description="Time series interval"),
+    PAGE: int = Query(1, ge=1, description="Page number"),
+    PAGE_SIZE: int = Query(500, ge=1, le=5000, description="Symbols per page")
+):
+    """
+    Ratings for any supported exchange, computed across a process pool and paginated.
+
+    A whole exchange takes far longer than one request, so a cold call starts
+    the job in the background and answers 202; poll the same URL until it
+    returns the ratings. Scheduler snapshots are served directly.
+    """
+    if exchange not in EXCHANGES:
+        raise HTTPException(status_code=404, detail=f"Unknown exchange. Valid options: {list(EXCHANGES)}")
+    try:
+        ttl = rating_cache.ttl_for(TIMESERIES)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    symbols = [item['symbol'] for item in forex_list]
+    async def compute():
+        symbols = await get_universe_symbols(exchange)
+        return await sharded_indicator_rating(symbols, RSI_PERIOD, TIMESERIES)
 
-    # Immediately calculate and return the results
-    forex_ratings = await tickers_indicator_rating(symbols, RSI_PERIOD, TIMESERIES)
+    snapshot = ratings_scheduler.latest(exchange, RSI_PERIOD, TIMESERIES)
+    if snapshot is not None:
+        ratings = snapshot["data"]
+    else:
+        ratings = rating_cache.get_or_start((exchange, RSI_PERIOD, TIMESERIES, "sharded"), ttl, compute)
+    if ratings is None:
+        response.status_code = 202
+        response.headers["Retry-After"] = "30"
+        return {"status": "pending"}
 
-    return forex_ratings
\ No newline at end of file
+    symbols = list(ratings)
+    start = (PAGE - 1) * PAGE_SIZE
+    return {
+        "total": len(symbols),
+        "page": PAGE,
+        "page_size": PAGE_SIZE,
+        "data": {sym: ratings[sym] for sym in symbols[start:start + PAGE_SIZE]}
+    }
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from settings.config import settings
+from fmp.scheduler import current_priority, BACKGROUND
+from .ratings import UNIVERSES, tickers_indicator_rating, get_universe_symbols
+from .timeframes import timeframe_seconds
+
+logger = logging.getLogger(__name__)
+
+
+class RatingsScheduler:
+    """
+    Precomputes ratings for every universe x timeframe shortly after each bar close.
+
+    Each (universe, timeframe) job runs on its own task. Jobs are offset from
+    each other by `stagger_seconds` so universes don't hit FMP at the same moment.
+    The latest snapshot per key is kept in a dict for O(1) reads by the routes.
+    """
+
+    def __init__(self, universes, timeframes, period=14, stagger_seconds=5.0, settle_seconds=5.0):
+        self.universes = list(universes)
+        self.timeframes = list(timeframes)
+        self.period = period
+        self.stagger_seconds = stagger_seconds
+        self.settle_seconds = settle_seconds
+
+        self.snapshots = {}     # (universe, period, timeframe) -> snapshot dict
+        self._tasks = []
+
+    def latest(self, universe, period, time_series):
+        """Returns the newest snapshot for the key, or None."""
+        return self.snapshots.get((universe, period, time_series))
+
+    def start(self):
+        if self._tasks:
+            return
+        jobs = [(u, ts) for ts in self.timeframes for u in self.universes]
+        for index, (universe, time_series) in enumerate(jobs):
+            offset = index * self.stagger_seconds
+            self._tasks.append(asyncio.create_task(self._run_job(universe, time_series, offset)))
+        logger.info(f"[RatingsScheduler] Started {len(jobs)} jobs")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def seconds_until_next_close(self, time_series, now=None):
+        """Seconds until the current bar of the timeframe closes (UTC-aligned)."""
+        now = time.time() if now is None else now
+        interval = timeframe_seconds(time_series)
+        return interval - (now % interval)
+
+    async def _run_job(self, universe, time_series, offset):
+        # Every FMP call made by this job yields to interactive requests
+        current_priority.set(BACKGROUND)
+        await asyncio.sleep(offset)
+        while True:
+            await self.refresh(universe, time_series)
+            delay = self.seconds_until_next_close(time_series) + self.settle_seconds + offset
+            await asyncio.sleep(delay)
+
+    async def refresh(self, universe, time_series):
+        """Recomputes one snapshot; failures keep the previous snapshot."""
+        key = (universe, self.period, time_series)
+        started = time.monotonic()
+        try:
+            symbols = await get_universe_symbols(universe)
+            data = await tickers_indicator_rating(symbols, self.period, time_series)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[RatingsScheduler] {universe}/{time_series} failed: {e}")
+            return None
+
+        previous = self.snapshots.get(key)
+        snapshot = {
+            "universe": universe,
+            "period": self.period,
+            "time_series": time_series,
+            "version": previous["version"] + 1 if previous else 1,
+            "computed_at": time.time(),
+            "data": data,
+        }
+        self.snapshots[key] = snapshot
+        logger.info(
+            f"[RatingsScheduler] {universe}/{time_series} v{snapshot['version']} "
+            f"({len(data)} symbols in {time.monotonic() - started:.2f}s)"
+        )
+        return snapshot
+
+    def describe(self):
+        """Snapshot metadata without the ratings payloads."""
+        return [
+            {k: v for k, v in snapshot.items() if k != "data"}
+            for snapshot in self.snapshots.values()
+        ]
+
+
+ratings_scheduler = RatingsScheduler(
+    universes=UNIVERSES,
+    timeframes=[ts.strip() for ts in settings.RATINGS_SCHEDULER_TIMEFRAMES.split(",") if ts.strip()],
+    period=settings.RATINGS_SCHEDULER_PERIOD,
+    stagger_seconds=settings.RATINGS_SCHEDULER_STAGGER_SECONDS,
+    settle_seconds=settings.RATINGS_SCHEDULER_SETTLE_SECONDS,
+)
@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from settings.config import settings
+from settings.lazy import lazy_import
+from .indicators import compute_latest
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    """Process pool shared by every sharded ratings request."""
+    global _executor
+    if _executor is None:
+        workers = settings.RATINGS_POOL_WORKERS or os.cpu_count()
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        logger.info(f"[Sharding] Started process pool with {workers} workers")
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+def _rate_shard(shm_name, shape, start, stop, period):
+    """
+    Worker: attaches to the shared (3, symbols, bars) block and computes one row range.
+    Only the three result vectors are pickled back.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        bars = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        latest = compute_latest(bars[0, start:stop], bars[1, start:stop], bars[2, start:stop], period)
+        return start, latest['rsi'].copy(), latest['adx'].copy(), latest['williams'].copy()
+    finally:
+        shm.close()
+
+
+class SharedBars:
+    """
+    NaN-filled (3, rows, width) float64 block of high/low/close in shared memory.
+
+    Callers write each symbol's bars straight into `array`, so the stacked
+    universe exists once and workers read it in place.
+    """
+
+    def __init__(self, rows, width):
+        self.shape = (3, rows, width)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(rows * width * 8 * 3, 1))
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self.shm.buf)
+        self.array.fill(np.nan)
+
+    def close(self):
+        # the ndarray must go before the buffer it views can be released
+        self.array = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def compute_latest_sharded(bars, period, shard_size=None):
+    """
+    Computes the latest RSI, ADX and Williams %R rows of a SharedBars block
+    across the process pool; only the row ranges and results are pickled.
+    """
+    rows = bars.shape[1]
+    shard_size = shard_size or settings.RATINGS_SHARD_SIZE
+    if rows <= shard_size:
+        return await asyncio.to_thread(compute_latest, *bars.array, period)
+
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    futures = [
+        loop.run_in_executor(executor, _rate_shard, bars.shm.name, bars.shape, start, min(start + shard_size, rows), period)
+        for start in range(0, rows, shard_size)
+    ]
+
+    latest = {name: np.full(rows, np.nan) for name in ('rsi', 'adx', 'williams')}
+    for start, rsi, adx, willr in await asyncio.gather(*futures):
+        stop = start + len(rsi)
+        latest['rsi'][start:stop] = rsi
+        latest['adx'][start:stop] = adx
+        latest['williams'][start:stop] = willr
+    return latest
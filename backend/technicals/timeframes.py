@@ -0,0 +1,49 @@
+import math
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# Bar length in seconds for every time series the ratings accept
+TIMEFRAME_SECONDS = {
+    '1min': 60,
+    '5min': 300,
+    '15min': 900,
+    '30min': 1800,
+    '1hour': 3600,
+    '4hour': 14400,
+    'daily': 86400,
+}
+
+# Markets are closed part of the day / week, so widen the calendar window
+SESSION_FACTOR = 1.6
+
+# FMP bar dates are naive wall-clock times on this exchange clock
+EXCHANGE_TZ = ZoneInfo("America/New_York")
+
+
+def timeframe_seconds(time_series):
+    """Returns the bar length in seconds for a time series name."""
+    try:
+        return TIMEFRAME_SECONDS[time_series]
+    except KeyError:
+        raise ValueError(f"Invalid time series '{time_series}'. Valid options: {list(TIMEFRAME_SECONDS)}")
+
+
+def lookback_days(time_series, bars):
+    """Calendar days of history needed to cover roughly `bars` bars."""
+    seconds = timeframe_seconds(time_series) * bars
+    return math.ceil(seconds / 86400 * SESSION_FACTOR) + 3
+
+
+def exchange_timestamp(ts=None):
+    """
+    Epoch seconds of the exchange wall clock at `ts` (default now), on the
+    same scale as naive FMP bar dates parsed as UTC.
+    """
+    ts = time.time() if ts is None else ts
+    return ts + datetime.fromtimestamp(ts, EXCHANGE_TZ).utcoffset().total_seconds()
+
+
+def exchange_today():
+    """The current date on the exchange clock, which FMP's daily bars are dated by."""
+    return datetime.now(EXCHANGE_TZ).date()
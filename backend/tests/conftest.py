@@ -0,0 +1,11 @@
+import os
+
+# Settings requires these; the tests never reach Azure or FMP
+for name, value in {
+    "SECRET_KEY": "test",
+    "ALLOWED_ORIGINS": "*",
+    "AZURE_STORAGE_CONNECTION_STRING": "UseDevelopmentStorage=true",
+    "FMP_APIKEY": "test",
+    "REFRESH_SECRET_KEY": "test",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,73 @@
+from datetime import date
+import pandas as pd
+import pytest
+from fmp import barstore
+from fmp.barstore import BarStore, merge_ranges, missing_ranges
+
+TODAY = date(2026, 10, 18)
+SATURDAY = date(2025, 10, 18)
+
+
+def bars(start, end, freq="B"):
+    dates = pd.date_range(start, end, freq=freq)
+    return pd.DataFrame({
+        "date": dates, "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 100.0,
+    })
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(barstore, "exchange_today", lambda: TODAY)
+    return BarStore(str(tmp_path))
+
+
+def test_merge_ranges_joins_overlapping_and_adjacent():
+    assert merge_ranges([[5, 6], [1, 3], [4, 4], [9, 10]]) == [[1, 6], [9, 10]]
+
+
+def test_missing_ranges():
+    coverage = [[1, 3], [6, 8]]
+    assert missing_ranges(coverage, 0, 10) == [(0, 0), (4, 5), (9, 10)]
+    assert missing_ranges(coverage, 1, 3) == []
+    assert missing_ranges([], 2, 4) == [(2, 4)]
+
+
+def test_daily_window_starting_on_weekend_is_covered(store):
+    fetched = store.write("AAA", "daily", bars(SATURDAY, TODAY), SATURDAY, TODAY)
+    assert fetched == len(bars(SATURDAY, TODAY))
+    # only today is refreshed; the weekend head of the window is not a gap
+    assert store.missing("AAA", "daily", SATURDAY, TODAY) == [(TODAY, TODAY)]
+
+
+def test_daily_late_listing_is_covered(store):
+    store.write("NEW", "daily", bars(date(2026, 6, 1), TODAY), SATURDAY, TODAY)
+    assert store.missing("NEW", "daily", SATURDAY, TODAY) == [(TODAY, TODAY)]
+
+
+def test_empty_response_covers_nothing(store):
+    assert store.write("AAA", "daily", None, SATURDAY, TODAY) == 0
+    assert store.missing("AAA", "daily", SATURDAY, TODAY) == [(SATURDAY, TODAY)]
+
+
+def test_intraday_coverage_starts_at_first_bar(store):
+    start, first = date(2026, 10, 5), date(2026, 10, 7)
+    store.write("AAA", "1hour", bars(first, date(2026, 10, 9), freq="h"), start, date(2026, 10, 9))
+    assert store.missing("AAA", "1hour", start, date(2026, 10, 9)) == [(start, date(2026, 10, 6))]
+
+
+def test_plan_batch_requests_only_the_gaps(store):
+    for symbol in ("AAA", "BBB"):
+        store.write(symbol, "daily", bars(SATURDAY, TODAY), SATURDAY, TODAY)
+    assert store.plan_batch(["AAA", "BBB"], "daily", SATURDAY, TODAY) == [(["AAA", "BBB"], TODAY, TODAY)]
+
+    # a never-fetched symbol gets its own window instead of widening everyone's
+    assert store.plan_batch(["AAA", "BBB", "CCC"], "daily", SATURDAY, TODAY) == [
+        (["CCC"], SATURDAY, TODAY),
+        (["AAA", "BBB"], TODAY, TODAY),
+    ]
+
+
+def test_plan_batch_fully_covered(store):
+    yesterday = date(2026, 10, 17)
+    store.write("AAA", "daily", bars(SATURDAY, yesterday), SATURDAY, yesterday)
+    assert store.plan_batch(["AAA"], "daily", SATURDAY, yesterday) == []
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from blob import blobManager
+from blob.aioBlobManager import AsyncBlobManager
+from blob.blobManager import BlobManager
+from blob.local import LocalBlobStore
+from settings.config import settings
+
+
+@pytest.fixture
+def local_manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BLOB_LOCAL_DIR", str(tmp_path / "blobs"))
+    return AsyncBlobManager()
+
+
+def test_blob_manager_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(blobManager, "local_store", LocalBlobStore(str(tmp_path / "blobs")))
+    source = tmp_path / "source.csv"
+    source.write_bytes(b"Index,Symbol,Name\n0,AAPL,Apple\n")
+
+    BlobManager.upload_to_blob_storage(str(source), "stocks/stocks_tickers.csv", "tickers")
+    target = tmp_path / "target.csv"
+    assert BlobManager.download_from_blob_storage("stocks/stocks_tickers.csv", str(target), "tickers")
+    assert target.read_bytes() == source.read_bytes()
+    assert BlobManager.is_valid_ticker("stocks", "aapl", "tickers")
+    assert not BlobManager.is_valid_ticker("stocks", "MSFT", "tickers")
+
+
+def test_blob_manager_missing_blob_creates_empty_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(blobManager, "local_store", LocalBlobStore(str(tmp_path / "blobs")))
+    target = tmp_path / "missing.csv"
+    assert not BlobManager.download_from_blob_storage("nope.csv", str(target), "tickers")
+    assert target.read_bytes() == b""
+
+
+def test_async_blob_manager_round_trip(local_manager):
+    async def run():
+        await local_manager.ensure_container_exists("tickers")
+        assert await local_manager.upload("tickers", "forex/forex_tickers.csv", b"data")
+        assert await local_manager.download("tickers", "forex/forex_tickers.csv") == b"data"
+        assert await local_manager.last_modified("tickers", "forex/forex_tickers.csv") is not None
+
+    asyncio.run(run())
+
+
+def test_async_blob_manager_missing_blob(local_manager):
+    async def run():
+        assert await local_manager.download("tickers", "missing.csv") is None
+        assert await local_manager.last_modified("tickers", "missing.csv") is None
+
+    asyncio.run(run())
+
+
+def test_local_store_rejects_paths_outside_container(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.upload("tickers", "../escape.csv", b"data")
@@ -0,0 +1,67 @@
+import asyncio
+import os
+import time
+import pytest
+import tickers
+import tickers.index
+from blob.aioBlobManager import AsyncBlobManager
+from settings.config import settings
+from tickers.index import TickerIndex
+
+
+class CountingBlobManager(AsyncBlobManager):
+    def __init__(self):
+        super().__init__()
+        self.downloads = {}
+
+    async def download(self, container, blob_name):
+        self.downloads[blob_name] = self.downloads.get(blob_name, 0) + 1
+        return await super().download(container, blob_name)
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "BLOB_LOCAL_DIR", str(tmp_path / "blobs"))
+    manager = CountingBlobManager()
+    index = TickerIndex()
+    monkeypatch.setattr(tickers, "ablob_manager", manager)
+    monkeypatch.setattr(tickers.index, "ablob_manager", manager)
+    monkeypatch.setattr(tickers, "ticker_index", index)
+
+    state = {"calls": 0, "in_flight": 0, "peak": 0}
+
+    async def inquiry(exchange):
+        state["calls"] += 1
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.05)
+        state["in_flight"] -= 1
+        return [{"symbol": f"{exchange.upper()}1", "name": f"{exchange} one"}]
+
+    monkeypatch.setattr(tickers, "ticker_inquiry", inquiry)
+    return manager, index, state
+
+
+def test_initialize_tickers_refreshes_exchanges_concurrently(env):
+    manager, index, state = env
+    asyncio.run(tickers.initialize_tickers())
+
+    assert state["calls"] == len(tickers.exchanges)
+    assert state["peak"] == len(tickers.exchanges)
+    for exchange in tickers.exchanges:
+        assert index.is_valid(exchange, f"{exchange}1")
+
+
+def test_initialize_tickers_downloads_each_blob_once(env):
+    manager, index, state = env
+    asyncio.run(tickers.initialize_tickers())
+    manager.downloads.clear()
+    stale = time.time() - 2 * tickers.UPDATE_THRESHOLD
+    for exchange in tickers.exchanges:
+        os.utime(manager.local._path(tickers.container_name, f"{exchange}/{exchange}_tickers.csv"), (stale, stale))
+
+    # Outdated but downloadable: no FMP calls, and the one download also feeds the index
+    asyncio.run(tickers.initialize_tickers())
+    assert state["calls"] == len(tickers.exchanges)
+    assert manager.downloads == {f"{exchange}/{exchange}_tickers.csv": 1 for exchange in tickers.exchanges}
+    assert index.stats()["exchanges"] == {exchange: 1 for exchange in tickers.exchanges}
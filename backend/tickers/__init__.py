@@ -1,12 +1,14 @@
-import os
+import asyncio
 import time
-import pandas as pd
-from fmp.connect import fmp_bridge
-from blob.blobManager import blob_manager
-from tempfile import NamedTemporaryFile
+from fmp.aioconnect import afmp_bridge
+from blob.aioBlobManager import ablob_manager
+from .index import ticker_index
 import logging
+from settings.lazy import lazy_import
 
-fmp_data = fmp_bridge
+pd = lazy_import("pandas")
+
+fmp_data = afmp_bridge
 UPDATE_THRESHOLD = 86400  # 1 day
 exchanges = ['forex', 'commodities', 'crypto', 'stocks']
 
@@ -34,123 +36,97 @@ def flatten_ticker_dataframe(df):
             })
     return tickers
 
-def ticker_inquiry(exchange):
+async def ticker_inquiry(exchange):
     if exchange == 'forex':
-        return fmp_data.get_forex_list()
+        return await fmp_data.get_forex_list()
     elif exchange == 'commodities':
-        return fmp_data.get_commodities_list()
+        return await fmp_data.get_commodities_list()
     elif exchange == 'crypto':
-        return fmp_data.get_cryptocurrencies_list()
+        return await fmp_data.get_cryptocurrencies_list()
     elif exchange == 'stocks':
-        return fmp_data.get_stocks_list()
+        return await fmp_data.get_stocks_list()
     return []
 
-def is_blob_updated(blob_name):
-    try:
-        blob_client = blob_manager.get_blob_client(container_name, blob_name)
-        properties = blob_client.get_blob_properties()
-        last_modified = properties.last_modified.timestamp()
-        return (time.time() - last_modified) < UPDATE_THRESHOLD
-    except Exception as e:
-        logging.info(f"Blob '{blob_name}' not found or error retrieving properties: {e}")
-        return False
-
-def save_ticker_list(blob_name, ticker_list):
+async def is_blob_updated(blob_name):
+    last_modified = await ablob_manager.last_modified(container_name, blob_name)
+    return last_modified is not None and (time.time() - last_modified) < UPDATE_THRESHOLD
+
+async def save_ticker_list(blob_name, ticker_list):
+    """Uploads the list as CSV and returns the CSV bytes."""
     csv_content = "Index,Symbol,Name\n" + "\n".join(
         f"{index},{ticker['symbol']},{ticker['name']}" for index, ticker in enumerate(ticker_list)
     )
+    data = csv_content.encode("utf-8")
+    if await ablob_manager.upload(container_name, blob_name, data):
+        logging.info(f"Ticker list saved to blob '{blob_name}'.")
+    return data
+
+def normalize_ticker_list(ticker_list):
+    """Turns an FMP list answer (frame or list) into [{"symbol", "name"}] rows."""
+    if isinstance(ticker_list, list) and ticker_list and isinstance(ticker_list[0], pd.DataFrame):
+        ticker_list = ticker_list[0]
+    if isinstance(ticker_list, pd.DataFrame):
+        if ticker_list.empty:
+            ticker_list = []
+        elif ticker_list.shape[0] == 1:
+            ticker_list = flatten_ticker_dataframe(ticker_list)
+        elif 'trading_symbol' in ticker_list.columns and 'short_name' in ticker_list.columns:
+            ticker_list = ticker_list.rename(columns={'trading_symbol': 'symbol', 'short_name': 'name'})
+            ticker_list = ticker_list.to_dict(orient="records")
+        elif 'symbol' in ticker_list.columns and 'name' in ticker_list.columns:
+            ticker_list = ticker_list.to_dict(orient="records")
+        else:
+            ticker_list = transform_tickers(ticker_list.iloc[:, 0].tolist())
+    elif isinstance(ticker_list, list) and ticker_list and isinstance(ticker_list[0], str):
+        ticker_list = transform_tickers(ticker_list)
+    elif ticker_list and isinstance(ticker_list[0], list):
+        ticker_list = ticker_list[0]
+    return ticker_list
+
+
+async def _refresh_ticker_blob(name, blob_name, fetch):
+    """
+    Re-fetches one ticker list from FMP unless its blob is fresh or still
+    downloadable. Returns the blob's CSV bytes, or None when there are none.
+    """
+    if await is_blob_updated(blob_name):
+        logging.info(f"{blob_name} is up-to-date.")
+        return await ablob_manager.download(container_name, blob_name)
 
-    # Write to temp file
-    with NamedTemporaryFile(mode='w+', delete=False, suffix='.csv') as tmp_file:
-        tmp_file.write(csv_content)
-        temp_file_path = tmp_file.name
+    logging.info(f"{blob_name} is outdated or missing. Fetching new data...")
+    blob = await ablob_manager.download(container_name, blob_name)
+    if blob is not None:
+        logging.info(f"Used blob file for {name} instead of re-fetching.")
+        return blob
 
-    # Now upload using file path
-    blob_manager.upload_to_blob_storage(temp_file_path, blob_name, container=container_name)
+    logging.info(f"Blob download failed. Fetching new {name} ticker list from API...")
+    data = await fetch()
+    if data is None:
+        logging.info("No data retrieved from FMP.")
+        return None
 
-    logging.info(f"Ticker list saved to blob '{blob_name}'.")
+    # large listings (stocks) take a while to convert; keep that off the loop
+    ticker_list = await asyncio.to_thread(normalize_ticker_list, data)
+    blob = await save_ticker_list(blob_name, ticker_list)
+    logging.info(f"Ticker list for {name} saved to blob storage.")
+    return blob
 
 
 async def initialize_tickers():
-    for exchange in exchanges:
-        blob_name = f"{exchange}/{exchange}_tickers.csv"
+    """
+    Refreshes every exchange concurrently on the shared async blob client, so
+    the total time follows the slowest exchange, then loads the ticker index
+    from the same bytes. The first failure is re-raised once the index is loaded.
+    """
+    blobs = await asyncio.gather(*(
+        _refresh_ticker_blob(exchange, f"{exchange}/{exchange}_tickers.csv", lambda exchange=exchange: ticker_inquiry(exchange))
+        for exchange in exchanges
+    ), return_exceptions=True)
+    await ticker_index.load(dict(zip(exchanges, blobs)))
+    for result in blobs:
+        if isinstance(result, Exception):
+            raise result
 
-        if is_blob_updated(blob_name):
-            logging.info(f"{blob_name} is up-to-date.")
-        else:
-            logging.info(f"{blob_name} is outdated or missing. Fetching new data...")
-            
-            with NamedTemporaryFile(delete=False, suffix=".csv") as tmp_file:
-                tmp_path = tmp_file.name
-                
-            if blob_manager.download_from_blob_storage(blob_name, tmp_path, container_name):
-                logging.info(f"Used blob file for {exchange} instead of re-fetching.")
-                continue
-
-            logging.info(f"Blob download failed. Fetching new ticker list from API...")
-            ticker_list = ticker_inquiry(exchange)
-
-            if isinstance(ticker_list, list) and ticker_list and isinstance(ticker_list[0], pd.DataFrame):
-                ticker_list = ticker_list[0]
-            if isinstance(ticker_list, pd.DataFrame):
-                if ticker_list.empty:
-                    ticker_list = []
-                elif ticker_list.shape[0] == 1:
-                    ticker_list = flatten_ticker_dataframe(ticker_list)
-                elif 'symbol' in ticker_list.columns and 'name' in ticker_list.columns:
-                    ticker_list = ticker_list.to_dict(orient="records")
-                else:
-                    ticker_list = transform_tickers(ticker_list.iloc[:, 0].tolist())
-            elif isinstance(ticker_list, list) and ticker_list and isinstance(ticker_list[0], str):
-                ticker_list = transform_tickers(ticker_list)
-            elif ticker_list and isinstance(ticker_list[0], list):
-                ticker_list = ticker_list[0]
-
-            save_ticker_list(blob_name, ticker_list)
-            os.remove(tmp_path)
-            logging.info(f"Ticker list for {exchange} saved to blob storage.")
 
 async def fetch_cot_list():
-    blob_name = "cot/cot_tickers.csv"
-
-    if is_blob_updated(blob_name):
-        logging.info(f"{blob_name} is up-to-date.")
-        return
-    
-    with NamedTemporaryFile(delete=False, suffix=".csv") as tmp_file:
-        tmp_path = tmp_file.name
-    
-    if blob_manager.download_from_blob_storage(blob_name, tmp_path, container_name):
-        logging.info(f"Used blob file for COT instead of re-fetching.")
-        return
-    
-    logging.info(f"Blob download failed. Fetching new COT ticker list from API...")
-    data = fmp_data.get_cot_list()
-
-    if data is None:
-        logging.info("No data retrieved from FMP.")
-        return
-
-    if isinstance(data, list) and data and isinstance(data[0], pd.DataFrame):
-        data = data[0]
-
-    if isinstance(data, pd.DataFrame):
-        if data.empty:
-            data = []
-        elif data.shape[0] == 1:
-            data = flatten_ticker_dataframe(data)
-        elif 'trading_symbol' in data.columns and 'short_name' in data.columns:
-            data = data.rename(columns={'trading_symbol': 'symbol', 'short_name': 'name'})
-            data = data.to_dict(orient="records")
-        elif 'symbol' in data.columns and 'name' in data.columns:
-            data = data.to_dict(orient="records")
-        else:
-            data = transform_tickers(data.iloc[:, 0].tolist())
-    elif isinstance(data, list) and data and isinstance(data[0], str):
-        data = transform_tickers(data)
-    elif data and isinstance(data[0], list):
-        data = data[0]
-
-    save_ticker_list(blob_name, data)
-    os.remove(tmp_path)
-    logging.info(f"Ticker list for COT saved to blob storage.")
\ No newline at end of file
+    await _refresh_ticker_blob("COT", "cot/cot_tickers.csv", fmp_data.get_cot_list)
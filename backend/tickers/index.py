@@ -0,0 +1,110 @@
+import asyncio
+import csv
+import io
+import logging
+import time
+from blob.aioBlobManager import ablob_manager
+
+logger = logging.getLogger(__name__)
+
+CONTAINER_NAME = "tickers"
+INDEXED_EXCHANGES = ['forex', 'commodities', 'crypto', 'stocks']
+
+# Websocket exchange names that are listed under another ticker blob
+EXCHANGE_ALIASES = {'company': 'stocks'}
+
+
+def _blob_exchange(exchange):
+    exchange = exchange.lower()
+    return EXCHANGE_ALIASES.get(exchange, exchange)
+
+
+def parse_ticker_csv(data):
+    """{SYMBOL: metadata} from an Index,Symbol,Name ticker blob."""
+    entries = {}
+    reader = csv.reader(io.StringIO(data.decode("utf-8")))
+    next(reader, None)
+    for row in reader:
+        if len(row) < 2 or not row[1].strip():
+            continue
+        symbol = row[1].strip()
+        # save_ticker_list does not quote names, so commas spill into extra columns
+        entries[symbol.upper()] = {"symbol": symbol, "name": ",".join(row[2:]).strip()}
+    return entries
+
+
+async def _parse_blob(data):
+    """Entries from a downloaded blob; None or a download error passes through."""
+    if data is None or isinstance(data, Exception):
+        return data
+    return await asyncio.to_thread(parse_ticker_csv, data)
+
+
+class TickerIndex:
+    """
+    In-memory ticker universe: (exchange, symbol) -> {"symbol", "name"}.
+
+    Built from the ticker blobs at startup and after /tickers/update-tickers.
+    A reload builds a complete new mapping and swaps it in with one
+    assignment, so readers never see a half-loaded universe. Lookups are
+    case-insensitive dict hits with no I/O.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self.loaded_at = None
+
+    async def reload(self, exchanges=INDEXED_EXCHANGES):
+        """Downloads every exchange's blob concurrently and loads them."""
+        blobs = await asyncio.gather(*(
+            ablob_manager.download(CONTAINER_NAME, f"{exchange}/{exchange}_tickers.csv") for exchange in exchanges
+        ), return_exceptions=True)
+        await self.load(dict(zip(exchanges, blobs)))
+
+    async def load(self, blobs):
+        """
+        Loads already downloaded blobs, {exchange: CSV bytes}; exchanges whose
+        blob is None or an exception keep their previous entries.
+        """
+        results = await asyncio.gather(*(_parse_blob(data) for data in blobs.values()), return_exceptions=True)
+        entries = dict(self._entries)
+        for exchange, result in zip(blobs, results):
+            if isinstance(result, Exception) or result is None:
+                logger.warning(f"[TickerIndex] Keeping previous '{exchange}' tickers: {result or 'blob unavailable'}")
+                continue
+            entries[exchange] = result
+        self._entries = entries
+        self.loaded_at = time.time()
+        logger.info(f"[TickerIndex] Loaded {self.stats()['exchanges']}")
+
+    def is_loaded(self, exchange):
+        return _blob_exchange(exchange) in self._entries
+
+    def get(self, exchange, symbol):
+        """Metadata for the ticker, or None when it is not listed."""
+        return self._entries.get(_blob_exchange(exchange), {}).get(symbol.upper())
+
+    def is_valid(self, exchange, symbol):
+        return self.get(exchange, symbol) is not None
+
+    def unknown(self, exchange, symbols):
+        """
+        Symbols not listed on `exchange`. Returns [] while the exchange is not
+        loaded yet, so subscriptions keep working during warm-up.
+        """
+        listed = self._entries.get(_blob_exchange(exchange))
+        if listed is None:
+            return []
+        return [symbol for symbol in symbols if symbol.upper() not in listed]
+
+    def symbols(self, exchange):
+        return [entry["symbol"] for entry in self._entries.get(_blob_exchange(exchange), {}).values()]
+
+    def stats(self):
+        return {
+            "loaded_at": self.loaded_at,
+            "exchanges": {exchange: len(entries) for exchange, entries in self._entries.items()},
+        }
+
+
+ticker_index = TickerIndex()
@@ -3,18 +3,24 @@ import websockets
 import json
 import logging
 from settings.config import settings
-from typing import Dict, Set
+from typing import Set
 
 logger = logging.getLogger()
 
-WS_URLS = {
+FMP_WS_URLS = {
     "company": "wss://websockets.financialmodelingprep.com",
     "crypto": "wss://crypto.financialmodelingprep.com",
     "forex": "wss://forex.financialmodelingprep.com"
 }
 
+# settings.FMP_WS_URLS overrides, e.g. to use a local stand-in
+WS_URLS = {
+    **FMP_WS_URLS,
+    **dict(pair.strip().split("=", 1) for pair in settings.FMP_WS_URLS.split(",") if "=" in pair),
+}
+
 class FMPListener:
-    def __init__(self, exchange: str, subscription_manager, websocket_manager, poll_interval: float = 1.0):
+    def __init__(self, exchange: str, subscription_manager, websocket_manager, debounce: float = None, live_indicators=None):
         if exchange not in WS_URLS:
             raise ValueError(f"Unsupported exchange: {exchange}")
         self.exchange = exchange
@@ -22,12 +28,13 @@ class FMPListener:
         self.websocket_manager = websocket_manager
         self.ws_url = WS_URLS[exchange]
         self._stop = False
-        self.current_subs: Dict[str, Set[str]] = {
-            "company": set(),
-            "crypto": set(),
-            "forex": set()
-        }
-        self.poll_interval = poll_interval
+        self.debounce = settings.FMP_WS_SUBSCRIBE_DEBOUNCE if debounce is None else debounce
+        self.live_indicators = live_indicators
+        # upstream changes not sent yet, fed by SubscriptionManager ref count transitions
+        self._pending_add: Set[str] = set()
+        self._pending_remove: Set[str] = set()
+        self._changed = asyncio.Event()
+        subscription_manager.watch(exchange, self._on_symbols_changed)
 
     def stop(self):
         self._stop = True
@@ -45,40 +52,70 @@ class FMPListener:
 
                     manage_task = asyncio.create_task(self._manage_subscriptions(ws, self.exchange))
 
-                    allowed_types = {"T", "Q", "B"}
-                    async for message in ws:
-                        try:
-                            raw = json.loads(message)
-                            if raw.get("type") not in allowed_types:
-                                continue
-                            normalized = self._normalize_data(raw, self.exchange)
-                            if normalized:
-                                clients = self.subscription_manager.get_matching_clients(normalized)
-                                logger.info(clients)
-                                for client in clients:
-                                    await self.websocket_manager.send_personal_message({
-                                        "event": "update",
-                                        "payload": normalized
-                                    }, client)
-                        except json.JSONDecodeError as e:
-                            logger.error(f"[FMP:{self.exchange}] JSON error: {e} - {message}")
-                        except Exception as e:
-                            logger.warning(f"[FMP:{self.exchange}] Processing error: {e}")
-
-                    manage_task.cancel()
+                    try:
+                        allowed_types = {"T", "Q", "B"}
+                        async for message in ws:
+                            try:
+                                raw = json.loads(message)
+                                if raw.get("type") not in allowed_types:
+                                    continue
+                                normalized = self._normalize_data(raw, self.exchange)
+                                if normalized:
+                                    if self.live_indicators is not None:
+                                        self.live_indicators.on_tick(normalized)
+                                    # queues only; client sockets are written by their own tasks
+                                    self.websocket_manager.broadcast(
+                                        {"event": "update", "payload": normalized},
+                                        self.subscription_manager.get_matching_clients(normalized),
+                                        key=normalized["ticker"],
+                                    )
+                            except json.JSONDecodeError as e:
+                                logger.error(f"[FMP:{self.exchange}] JSON error: {e} - {message}")
+                            except Exception as e:
+                                logger.warning(f"[FMP:{self.exchange}] Processing error: {e}")
+                    finally:
+                        # never leave the old connection's task consuming subscription changes
+                        manage_task.cancel()
             except Exception as e:
                 logger.error(f"[FMP:{self.exchange}] Connection error: {e}, retrying in 3s")
                 await asyncio.sleep(3)
 
+    def _on_symbols_changed(self, added: Set[str], removed: Set[str]):
+        """Called when a ticker gets its first client or loses its last one; batched by the manager task."""
+        for ticker in added:
+            if ticker in self._pending_remove:
+                self._pending_remove.discard(ticker)
+            else:
+                self._pending_add.add(ticker)
+        for ticker in removed:
+            if ticker in self._pending_add:
+                self._pending_add.discard(ticker)
+            else:
+                self._pending_remove.add(ticker)
+        if removed and self.live_indicators is not None:
+            self.live_indicators.untrack(removed)
+        self._changed.set()
+
     async def _manage_subscriptions(self, ws, exchange: str):
+        """
+        Sends subscribe/unsubscribe diffs upstream as clients come and go.
+        Sleeps until a change arrives, then waits `debounce` so a burst of
+        changes goes out as one message each way.
+        """
+        # a new connection has no upstream subscriptions yet: start from everything wanted now
+        current = set()
+        self._pending_add = set(self.subscription_manager.get_all_symbols(exchange))
+        self._pending_remove = set()
+        self._changed.set()
+
         while not self._stop:
+            await self._changed.wait()
+            await asyncio.sleep(self.debounce)
+            self._changed.clear()
+            to_add = list(self._pending_add - current)
+            to_remove = list(self._pending_remove & current)
+            self._pending_add, self._pending_remove = set(), set()
             try:
-                desired = set(self.subscription_manager.get_all_symbols(exchange))
-                current = self.current_subs[exchange]
-
-                to_add = list(desired - current)
-                to_remove = list(current - desired)
-
                 if to_add:
                     await ws.send(json.dumps({"event": "subscribe", "data": {"ticker": to_add}}))
                     logger.info(f"[FMP:{exchange}] Subscribed to {to_add}")
@@ -90,8 +127,8 @@ class FMPListener:
                     current.difference_update(to_remove)
 
             except Exception as e:
+                # the connection is going away; the reconnect resubscribes from scratch
                 logger.warning(f"[FMP:{exchange}] Subscription error: {e}")
-            await asyncio.sleep(self.poll_interval)
 
     def _normalize_data(self, raw: dict, exchange: str) -> dict:
         try:
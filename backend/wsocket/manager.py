@@ -1,19 +1,67 @@
+import asyncio
+import logging
 from fastapi.websockets import WebSocket
-from typing import Dict, List
-import json
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+from settings.config import settings
+from fmp.serialize import encode_json
 from .subsciber import SubscriptionManager
 
+logger = logging.getLogger(__name__)
+
+# Close code sent to clients that cannot keep up (policy violation)
+SLOW_CLIENT_CLOSE_CODE = 1008
+
+BATCH_FORMATS = ("rows", "columnar")
+
 
 class WebSocketManager:
-    def __init__(self, subscription_manager: SubscriptionManager):
+    """
+    Fans messages out to websocket clients without ever awaiting a client socket.
+
+    Every connection gets a bounded outbound queue drained by its own writer
+    task. Messages are encoded to JSON once and the same text is queued for
+    every recipient. A client whose queue overflows, or whose send takes
+    longer than WS_SEND_TIMEOUT, is disconnected instead of slowing the others.
+
+    Clients that subscribe with "conflate": true keep only the latest pending
+    update per ticker: a newer tick replaces the queued one in place, so a
+    slow reader skips intermediate quotes, always gets the freshest value,
+    and its backlog is bounded by its subscribed tickers.
+
+    Clients that subscribe with "batch_ms": N get market updates collected
+    into one {"event": "updates"} frame every N milliseconds, either as a
+    list of updates ("batch_format": "rows") or as parallel arrays per field
+    ("columnar"). Combined with "conflate", a batch holds the latest update
+    per ticker.
+    """
+
+    def __init__(self, subscription_manager: SubscriptionManager, live_indicators=None):
         self.active_clients: List[WebSocket] = []
-        self.client_subscriptions: Dict[WebSocket, dict] = {} 
+        self.client_subscriptions: Dict[WebSocket, dict] = {}
         self.subscription_manager = subscription_manager
-        
+        self.live_indicators = live_indicators
+        self._queues: Dict[WebSocket, asyncio.Queue] = {}
+        self._writers: Dict[WebSocket, asyncio.Task] = {}
+        self._conflating: Set[WebSocket] = set()
+        self._pending: Dict[WebSocket, Dict[str, str]] = {}     # client -> ticker -> latest encoded update
+        self._counters: Dict[WebSocket, Dict[str, int]] = {}
+        self._batching: Dict[WebSocket, Tuple[float, str]] = {}        # client -> (seconds, format)
+        self._batches: Dict[WebSocket, Union[list, dict]] = {}          # buffered updates of the open batch
+        self._flush_timers: Dict[WebSocket, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()      # fire-and-forget tasks, referenced until done
+        self.stats = {
+            "sent": 0, "conflated": 0, "dropped": 0, "batched": 0,
+            "overflow_disconnects": 0, "timeout_disconnects": 0, "error_disconnects": 0,
+        }
+
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_clients.append(websocket)
         self.subscription_manager.register_client(websocket)
+        self._queues[websocket] = asyncio.Queue(maxsize=settings.WS_CLIENT_QUEUE_SIZE)
+        self._pending[websocket] = {}
+        self._counters[websocket] = {"sent": 0, "conflated": 0, "dropped": 0, "batched": 0}
+        self._writers[websocket] = asyncio.create_task(self._writer(websocket))
         await self.send_personal_message({"event": "status", "payload": "Connected to Market Screener WebSocket"}, websocket)
 
     def disconnect(self, websocket: WebSocket):
@@ -22,22 +70,240 @@ class WebSocketManager:
         self.subscription_manager.unregister_client(websocket)
         if websocket in self.client_subscriptions:
             del self.client_subscriptions[websocket]
+        queue = self._queues.pop(websocket, None)
+        if queue is not None and queue.qsize():
+            self.stats["dropped"] += queue.qsize()
+        self._conflating.discard(websocket)
+        self._pending.pop(websocket, None)
+        self._counters.pop(websocket, None)
+        self._batching.pop(websocket, None)
+        self._batches.pop(websocket, None)
+        timer = self._flush_timers.pop(websocket, None)
+        if timer is not None:
+            timer.cancel()
+        writer = self._writers.pop(websocket, None)
+        if writer is not None and writer is not asyncio.current_task():
+            writer.cancel()
 
-    async def send_personal_message(self, message: dict, websocket: WebSocket):
+    def _drop(self, websocket: WebSocket, reason: str):
+        """Disconnects a client that cannot keep up and closes its socket."""
+        if websocket not in self._queues:
+            return
+        self.stats[f"{reason}_disconnects"] += 1
+        logger.warning(f"[WS] Disconnecting client ({reason})")
+        self.disconnect(websocket)
+        self._spawn(self._close(websocket))
+
+    def _spawn(self, coro):
+        """Runs `coro` in the background, holding a reference so it is not garbage-collected mid-run."""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    @staticmethod
+    async def _close(websocket: WebSocket):
         try:
-            await websocket.send_json(message)
-        except Exception as e:
-            # Log the error for debugging
-            print(f"Error sending message: {e}")
-            self.disconnect(websocket)
-        
+            await asyncio.wait_for(websocket.close(code=SLOW_CLIENT_CLOSE_CODE), timeout=settings.WS_SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    async def _writer(self, websocket: WebSocket):
+        queue = self._queues[websocket]
+        pending = self._pending[websocket]
+        counters = self._counters[websocket]
+        while True:
+            key, text = await queue.get()
+            if key is not None:
+                # conflated update: send whatever is newest for the ticker now
+                text = pending.pop(key, None)
+                if text is None:
+                    continue
+            try:
+                await asyncio.wait_for(websocket.send_text(text), timeout=settings.WS_SEND_TIMEOUT)
+                counters["sent"] += 1
+                self.stats["sent"] += 1
+            except asyncio.TimeoutError:
+                self._drop(websocket, "timeout")
+                return
+            except Exception as e:
+                logger.info(f"[WS] Error sending message: {e}")
+                self._drop(websocket, "error")
+                return
+
+    def send_encoded(self, text: str, websocket: WebSocket, key: Optional[str] = None):
+        """
+        Queues already encoded JSON text for one client; never blocks. With a
+        `key` (ticker) and a conflating client, replaces that ticker's pending
+        update instead of queueing another one.
+        """
+        queue = self._queues.get(websocket)
+        if queue is None:
+            return
+        item = (None, text)
+        if key is not None and websocket in self._conflating:
+            pending = self._pending[websocket]
+            replaced = key in pending
+            pending[key] = text
+            if replaced:
+                self._counters[websocket]["conflated"] += 1
+                self.stats["conflated"] += 1
+                return
+            # the writer picks up the newest text for `key` when it gets here
+            item = (key, None)
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._counters[websocket]["dropped"] += 1
+            self.stats["dropped"] += 1
+            self._drop(websocket, "overflow")
+
+    def broadcast(self, message: dict, clients: Iterable[WebSocket], key: Optional[str] = None):
+        """
+        Encodes `message` once and queues it for every client in `clients`.
+        Pass the ticker as `key` for market updates so conflating clients can
+        replace stale ones and batching clients can buffer them.
+        """
+        text = None
+        payload = None
+        for websocket in clients:
+            if key is not None and websocket in self._batching:
+                if self._batching[websocket][1] == "rows":
+                    if payload is None:
+                        payload = encode_json(message["payload"])
+                    self._add_to_batch(websocket, key, payload)
+                else:
+                    self._add_to_batch(websocket, key, message["payload"])
+                continue
+            if text is None:
+                text = encode_json(message).decode()
+            self.send_encoded(text, websocket, key)
+
+    def _add_to_batch(self, websocket: WebSocket, key: str, update):
+        """Buffers an update (encoded for rows, a dict for columnar) and arms the flush timer."""
+        batch = self._batches.get(websocket)
+        if batch is None:
+            batch = self._batches[websocket] = {} if websocket in self._conflating else []
+            seconds = self._batching[websocket][0]
+            self._flush_timers[websocket] = asyncio.get_running_loop().call_later(seconds, self._flush, websocket)
+        if isinstance(batch, dict):
+            if key in batch:
+                self._counters[websocket]["conflated"] += 1
+                self.stats["conflated"] += 1
+            batch[key] = update
+        else:
+            batch.append(update)
+        self._counters[websocket]["batched"] += 1
+        self.stats["batched"] += 1
+        if len(batch) >= settings.WS_BATCH_MAX_UPDATES:
+            self._flush(websocket)
+
+    def _flush(self, websocket: WebSocket):
+        """Queues the open batch as one frame."""
+        timer = self._flush_timers.pop(websocket, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._batches.pop(websocket, None)
+        if not batch:
+            return
+        updates = list(batch.values()) if isinstance(batch, dict) else batch
+        batch_format = self._batching.get(websocket, (None, "rows"))[1]
+        if batch_format == "columnar":
+            columns = {}
+            for index, update in enumerate(updates):
+                for field, value in update.items():
+                    column = columns.get(field)
+                    if column is None:
+                        column = columns[field] = [None] * index
+                    column.append(value)
+                for column in columns.values():
+                    if len(column) <= index:
+                        column.append(None)
+            text = encode_json({"event": "updates", "format": "columnar", "count": len(updates), "payload": columns}).decode()
+        else:
+            text = (b'{"event":"updates","format":"rows","count":%d,"payload":[' % len(updates)
+                    + b",".join(updates) + b"]}").decode()
+        self.send_encoded(text, websocket)
+
+    @staticmethod
+    def batch_options(payload: dict) -> Optional[Tuple[float, str]]:
+        """(seconds, format) from a subscribe payload's batch_ms / batch_format, or None when not batching."""
+        batch_ms = payload.get("batch_ms")
+        if not batch_ms:
+            return None
+        if not isinstance(batch_ms, (int, float)) or isinstance(batch_ms, bool):
+            raise ValueError("batch_ms must be a number of milliseconds")
+        batch_format = payload.get("batch_format", "rows")
+        if batch_format not in BATCH_FORMATS:
+            raise ValueError(f"batch_format must be one of {', '.join(BATCH_FORMATS)}")
+        batch_ms = min(max(batch_ms, settings.WS_BATCH_MIN_MS), settings.WS_BATCH_MAX_MS)
+        return batch_ms / 1000, batch_format
+
+    def set_batching(self, websocket: WebSocket, options: Optional[Tuple[float, str]]):
+        if websocket not in self._queues:
+            return
+        if self._batching.get(websocket) != options:
+            # the open batch goes out in the format it was collected for
+            self._flush(websocket)
+        if options is None:
+            self._batching.pop(websocket, None)
+        else:
+            self._batching[websocket] = options
+
+    def set_conflation(self, websocket: WebSocket, enabled: bool):
+        if websocket not in self._queues:
+            return
+        if enabled:
+            self._conflating.add(websocket)
+        else:
+            # updates already pending are still delivered by the writer
+            self._conflating.discard(websocket)
+        batch = self._batches.get(websocket)
+        if batch is not None and isinstance(batch, dict) != enabled:
+            self._flush(websocket)
+
+    def client_stats(self, websocket: WebSocket) -> dict:
+        """Per-client counters: frames sent, updates skipped by conflation, messages dropped, updates batched."""
+        queue = self._queues.get(websocket)
+        batching = self._batching.get(websocket)
+        return {
+            **self._counters.get(websocket, {}),
+            "queued": queue.qsize() if queue is not None else 0,
+            "conflate": websocket in self._conflating,
+            "batch_ms": round(batching[0] * 1000) if batching else None,
+            "batch_format": batching[1] if batching else None,
+        }
+
+    def snapshot(self) -> dict:
+        """Totals plus per-client counters for every connected client."""
+        return {
+            **self.stats,
+            "clients": [
+                {"client": f"{ws.client.host}:{ws.client.port}" if getattr(ws, "client", None) else None,
+                 **self.client_stats(ws)}
+                for ws in self.active_clients
+            ],
+        }
+
+    async def send_personal_message(self, message: dict, websocket: WebSocket):
+        self.send_encoded(encode_json(message).decode(), websocket)
+
     async def receive_event(self, websocket: WebSocket, data: dict):
+        # dropped (e.g. too slow) but its receive loop has not ended yet: nothing to update
+        if websocket not in self._queues:
+            return
         event = data.get("event")
         payload = data.get("payload", {})
 
         if event in {"subscribe", "update_subscription"}:
             try:
+                batching = self.batch_options(payload)
                 self.subscription_manager.update_subscription(websocket, payload)
+                self.set_conflation(websocket, bool(payload.get("conflate")))
+                self.set_batching(websocket, batching)
+                if payload.get("ratings") and settings.LIVE_RATINGS_PUSH and self.live_indicators is not None:
+                    tickers = payload.get("filters", {}).get("ticker", [])
+                    self._spawn(self.live_indicators.track(tickers))
                 await self.send_personal_message({
                     "event": f"{event}",
                     "payload": payload
@@ -55,6 +321,12 @@ class WebSocketManager:
                 "payload": {}
             }, websocket)
 
+        elif event == "stats":
+            await self.send_personal_message({
+                "event": "stats",
+                "payload": self.client_stats(websocket)
+            }, websocket)
+
         else:
             await self.send_personal_message({
                 "event": "error",
@@ -63,9 +335,15 @@ class WebSocketManager:
 
 
     async def broadcast_filtered(self, market_data: dict):
-        matching_clients = self.subscription_manager.get_matching_clients(market_data)
-        for websocket in matching_clients:
-            await self.send_personal_message({
-                "event": "update",
-                "payload": market_data
-            }, websocket)
\ No newline at end of file
+        self.broadcast(
+            {"event": "update", "payload": market_data},
+            self.subscription_manager.get_matching_clients(market_data),
+            key=market_data.get("ticker"),
+        )
+
+    async def push_rating(self, exchange: str, ticker: str, time_series: str, rating: dict):
+        """Sends a live rating change to clients that opted into ratings."""
+        self.broadcast(
+            {"event": "rating", "payload": {"ticker": ticker, "time_series": time_series, **rating}},
+            self.subscription_manager.get_rating_clients(exchange, ticker),
+        )
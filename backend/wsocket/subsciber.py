@@ -1,6 +1,7 @@
 from fastapi.websockets import WebSocket
-from typing import Dict, List, Set, Any
+from typing import Callable, Dict, List, Set, Any
 import logging
+from tickers.index import ticker_index
 
 logger = logging.getLogger()
 
@@ -8,12 +9,94 @@ class SubscriptionManager:
     def __init__(self):
         # Stores per-client subscription info
         self.subscriptions: Dict[WebSocket, Dict[str, Any]] = {}
+        # Inverted index: exchange -> ticker -> clients, kept in step with `subscriptions`.
+        # The size of each client set is the ticker's reference count.
+        self._by_ticker: Dict[str, Dict[str, Set[WebSocket]]] = {}
+        # Filters other than the ticker list, applied to index candidates only
+        self._post_filters: Dict[WebSocket, Dict[str, Any]] = {}
+        # exchange -> callbacks(added, removed) for upstream subscription changes
+        self._watchers: Dict[str, List[Callable[[Set[str], Set[str]], None]]] = {}
+
+    def watch(self, exchange: str, callback: Callable[[Set[str], Set[str]], None]):
+        """
+        Registers `callback(added, removed)` for `exchange`. It is called with
+        the tickers whose reference count went 0 -> 1 and 1 -> 0, and only
+        when there are any.
+        """
+        self._watchers.setdefault(exchange, []).append(callback)
 
     def register_client(self, websocket: WebSocket):
         self.subscriptions[websocket] = {}
 
     def unregister_client(self, websocket: WebSocket):
-        self.subscriptions.pop(websocket, None)
+        self._replace(websocket, None)
+
+    def _replace(self, websocket: WebSocket, config):
+        """Swaps a client's subscription (None removes the client) and reports ref count transitions."""
+        old_exchange, removed = self._unindex(websocket)
+        if config is None:
+            self.subscriptions.pop(websocket, None)
+            new_exchange, added = None, set()
+        else:
+            self.subscriptions[websocket] = config
+            new_exchange, added = self._index(websocket, config)
+
+        if old_exchange == new_exchange:
+            self._notify(new_exchange, added - removed, removed - added)
+        else:
+            self._notify(old_exchange, set(), removed)
+            self._notify(new_exchange, added, set())
+
+    def _notify(self, exchange, added: Set[str], removed: Set[str]):
+        if not (added or removed):
+            return
+        for callback in self._watchers.get(exchange, []):
+            try:
+                callback(added, removed)
+            except Exception as e:
+                logger.warning(f"[SUBS] Subscription watcher failed for {exchange}: {e}")
+
+    def _index(self, websocket: WebSocket, config: Dict[str, Any]):
+        """Adds the client to the index; returns its exchange and the tickers that gained their first client."""
+        exchange = config.get("exchange")
+        filters = config.get("filters") or {}
+        added = set()
+        if not exchange or not filters:
+            return exchange, added
+        tickers = filters.get("ticker")
+        if isinstance(tickers, list):
+            exchange_index = self._by_ticker.setdefault(exchange, {})
+            for ticker in set(tickers):
+                clients = exchange_index.get(ticker)
+                if clients is None:
+                    clients = exchange_index[ticker] = set()
+                    added.add(ticker)
+                clients.add(websocket)
+        extra = {key: value for key, value in filters.items() if key != "ticker"}
+        if extra:
+            self._post_filters[websocket] = extra
+        return exchange, added
+
+    def _unindex(self, websocket: WebSocket):
+        """Removes the client from the index; returns its exchange and the tickers left without clients."""
+        config = self.subscriptions.get(websocket) or {}
+        exchange = config.get("exchange")
+        filters = config.get("filters") or {}
+        removed = set()
+        self._post_filters.pop(websocket, None)
+        if not exchange or not filters:
+            return exchange, removed
+        tickers = filters.get("ticker")
+        if isinstance(tickers, list):
+            exchange_index = self._by_ticker.get(exchange, {})
+            for ticker in set(tickers):
+                clients = exchange_index.get(ticker)
+                if clients is not None:
+                    clients.discard(websocket)
+                    if not clients:
+                        del exchange_index[ticker]
+                        removed.add(ticker)
+        return exchange, removed
 
     def update_subscription(self, websocket: WebSocket, payload: Dict[str, Any]):
         filters = payload["filters"]
@@ -23,34 +106,37 @@ class SubscriptionManager:
             raise ValueError("Missing or invalid filters in payload")
         if "ticker" in filters and isinstance(filters["ticker"], list):
             filters["ticker"] = [t.lower() for t in filters["ticker"]]
+            unknown = ticker_index.unknown(payload["exchange"], filters["ticker"])
+            if unknown:
+                raise ValueError(f"Unknown tickers for {payload['exchange']}: {', '.join(unknown)}")
             # Store the normalized payload
-            self.subscriptions[websocket] = payload
+            self._replace(websocket, payload)
 
     def clear_subscription(self, websocket: WebSocket):
         if websocket in self.subscriptions:
-            self.subscriptions[websocket] = {}
+            self._replace(websocket, {})
 
     def get_matching_clients(self, market_data: Dict[str, Any]) -> List[WebSocket]:
-        matched_clients = []
-
+        """
+        Clients interested in this tick, looked up by (exchange, ticker).
+        Only those candidates are checked against sector/volume/market cap
+        filters, so the cost follows the number of interested clients.
+        """
         data_exchange = market_data.get("exchange")
         if not data_exchange:
-            return matched_clients
-
-        for ws, config in self.subscriptions.items():
-            logger.debug(f"[SUBS] client={ws} exchange={config.get('exchange')} filters={config.get('filters')}")
-            if config.get("exchange") != data_exchange:
-                continue
+            return []
 
-            filters = config.get("filters", {})
-            if not filters:
-                continue
+        candidates = self._by_ticker.get(data_exchange, {}).get(market_data.get("ticker"))
+        if not candidates:
+            return []
 
-            if self._matches_filters(market_data, filters):
-                logger.debug(f"[MATCH] data ticker={market_data.get('ticker')} vs filters={filters.get('ticker')}")
-                matched_clients.append(ws)
-
-        return matched_clients
+        post_filters = self._post_filters
+        if not post_filters:
+            return list(candidates)
+        return [
+            ws for ws in candidates
+            if ws not in post_filters or self._matches_filters(market_data, post_filters[ws])
+        ]
 
 
     def _matches_filters(self, data: Dict[str, Any], filters: Dict[str, Any]) -> bool:
@@ -89,14 +175,13 @@ class SubscriptionManager:
 
         return True
     
+    def get_rating_clients(self, exchange: str, ticker: str) -> List[WebSocket]:
+        """Clients subscribed to the ticker that opted into live rating events."""
+        return [
+            ws for ws in self.get_matching_clients({"exchange": exchange, "ticker": ticker})
+            if self.subscriptions.get(ws, {}).get("ratings")
+        ]
+
     def get_all_symbols(self, exchange: str) -> Set[str]:
-        symbols = set()
-        for config in self.subscriptions.values():
-            if config.get("exchange") != exchange:
-                continue
-            filters = config.get("filters", {})
-            tickers = filters.get("ticker", [])
-            if isinstance(tickers, list):
-                symbols.update(tickers)
-        return symbols
+        return set(self._by_ticker.get(exchange, {}))
 